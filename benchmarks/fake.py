@@ -0,0 +1,79 @@
+"""Synthetic annotation/content json shaped like lds.org's API, so
+benchmarks can run without an account."""
+import random
+from datetime import datetime, timedelta
+
+TYPES = ["highlight", "journal", "reference", "bookmark"]
+COLORS = ["yellow", "red", "blue", "green", "purple", "orange"]
+TAGS = [f"Tag{i}" for i in range(40)]
+FOLDERS = [f"folder-{i}" for i in range(15)]
+BOOKS = [("bofm/hel", "Helaman", "Book of Mormon"),
+         ("bofm/alma", "Alma", "Book of Mormon"),
+         ("nt/john", "John", "New Testament"),
+         ("dc-testament/dc", "Doctrine and Covenants",
+          "Doctrine and Covenants")]
+VERSE = ('<p class="verse" id="p{v}"><span class="verse-number">{v} </span>'
+         'Yea, we see that whosoever will may lay hold upon the <a '
+         'class="study-note-ref" href="#note{v}a"><sup class="marker">a</sup>'
+         'word</a> of God, which is quick and powerful&#x2014;</p>')
+
+
+def _uri(rng):
+    book = rng.choice(BOOKS)
+    return (f"/scriptures/{book[0]}/{rng.randint(1, 30)}"
+            f".p{rng.randint(1, 40)}")
+
+
+def fake_annotations(n, seed=0):
+    """Returns n annotation dictionaries like the ANNOTATIONS endpoint."""
+    rng = random.Random(seed)
+    now = datetime(2021, 3, 1)
+    out = []
+    for i in range(n):
+        kind = rng.choice(TYPES)
+        j = {"id": f"{i:08x}-0000-4000-8000-{rng.getrandbits(48):012x}",
+             "type": kind,
+             "locale": "eng",
+             "tags": rng.sample(TAGS, rng.randint(0, 3)),
+             "folders": [{"id": f}
+                         for f in rng.sample(FOLDERS, rng.randint(0, 2))],
+             "lastUpdated": (now - timedelta(minutes=i * 7)).isoformat()}
+        if kind != "bookmark":
+            j["note"] = {"title": f"Note {i}", "content": "Some thoughts."}
+        if kind in ("highlight", "reference"):
+            j["highlight"] = {"content": [
+                {"uri": _uri(rng), "color": rng.choice(COLORS),
+                 "startOffset": rng.randint(-1, 4),
+                 "endOffset": rng.randint(-1, 4)}]}
+        if kind == "reference":
+            j["refs"] = [{"uri": _uri(rng)}]
+        if kind == "bookmark":
+            book = rng.choice(BOOKS)
+            j["bookmark"] = {"name": book[1], "reference": book[1],
+                             "publication": book[2], "uri": _uri(rng)}
+        out.append(j)
+    return out
+
+
+def fake_content(uri):
+    """Returns a content dictionary like the CONTENT endpoint for uri."""
+    path = uri.split("/")
+    book = [b for b in BOOKS if "/".join(path[3:5]) == b[0]][0]
+    chapter, verse = path[-1].split(".p")
+    return {"content": [{"id": f"p{verse}",
+                         "markup": VERSE.format(v=verse)}],
+            "headline": f"{book[1]} {chapter}",
+            "publication": book[2],
+            "referenceURIDisplayText": f"{book[1]} {chapter}:{verse}",
+            "uri": uri}
+
+
+def fill_cache(cache, annotations):
+    """Puts fake content for every uri in annotations into cache, so
+    make_annotation never has to go to the network."""
+    for j in annotations:
+        parts = j.get("highlight", {}).get("content", []) + j.get("refs", [])
+        for p in parts:
+            uri = f"/{j['locale']}{p['uri']}"
+            if uri not in cache:
+                cache.set(uri, fake_content(uri))
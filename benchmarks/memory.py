@@ -0,0 +1,29 @@
+"""Reports how many bytes each parsed annotation takes in memory.
+
+Run with ``python benchmarks/memory.py [number of annotations]``."""
+import sys
+import tracemalloc
+
+from ldsnotes import ResponseCache
+from ldsnotes.annotations import make_annotation
+from fake import fake_annotations, fill_cache
+
+
+def main(n=100000):
+    pages = fake_annotations(n)
+    cache = ResponseCache()
+    fill_cache(cache, pages)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    annotations = make_annotation(pages, cache=cache)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    total = after - before
+    print(f"{len(annotations)} annotations: {total / 2**20:.1f} MiB, "
+          f"{total / len(annotations):.0f} bytes/annotation")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -6,5 +6,16 @@ __email__ = 'contagon6@gmail.com'
 __version__ = '0.1.5'
 
 from ldsnotes.content import Content
+from ldsnotes.cache import ResponseCache, CachedSession
+from ldsnotes.coalesce import ContentCoalescer
 from ldsnotes.annotations import Bookmark, Journal, Highlight, Reference, Annotation
 from ldsnotes.note import Notes, Tag, Folder
+from ldsnotes.membership import FolderIndex
+from ldsnotes.batch import BatchRunner, AccountSummary
+from ldsnotes.sync import SyncEngine
+from ldsnotes.changes import Diff, diff, fingerprints
+from ldsnotes.graph import ReferenceGraph
+from ldsnotes.paging import PageSizer
+from ldsnotes.aggregate import Aggregator
+from ldsnotes.snapshot import Snapshot, StaleSnapshotError
+from ldsnotes.watch import Watcher, Event
@@ -0,0 +1,187 @@
+from array import array
+from collections import Counter
+from datetime import date
+from operator import itemgetter
+
+from ldsnotes import columnar
+
+# fields with one value per annotation, and ones with a list of them
+SINGLE = ("type", "color", "publication", "locale")
+MULTI = ("tags", "folders_id")
+BUCKETS = ("year", "month", "week", "day")
+
+
+def _gather(values, rows):
+    # values[r] for r in rows, done in C
+    if len(rows) == 0:
+        return []
+    if len(rows) == 1:
+        return [values[rows[0]]]
+    return list(itemgetter(*rows)(values))
+
+
+class Aggregator:
+    """Counts annotations grouped by type, color, publication, locale, tag,
+    folder and time (year/month/week/day of last_update).
+
+    Every field is stored as an array of small integer codes (with a lookup
+    table back to the real value), so grouping is just counting tuples of
+    integers. Tags and folders are stored flattened with the row they came
+    from.
+
+    Examples
+    ---------
+    >>> agg = Aggregator()
+    >>> for page in n.pages():
+    ...     agg.add(page)
+    >>> agg.count("color").most_common(2)
+    [('yellow', 812), ('blue', 301)]
+    >>> agg.count(["publication", "month"], where={"type": "highlight"})
+    Counter({('Book of Mormon', '2021-02'): 96, ...})
+    """
+
+    def __init__(self):
+        self._codes = {f: {} for f in SINGLE + MULTI}
+        self._values = {f: [] for f in SINGLE + MULTI}
+        self._cols = {f: array('i') for f in SINGLE}
+        # flattened tags/folders, and which row each came from
+        self._flat = {f: (array('i'), array('i')) for f in MULTI}
+        self._day = array('i')
+        self.rows = 0
+
+    def add(self, annotations, cache=None):
+        """Adds annotations to be counted.
+
+        Parameters
+        -----------
+        annotations : list
+            A page of raw annotation dictionaries (ie from Notes.pages),
+            or annotation objects.
+        cache : ResponseCache
+            Content cache used to look up publications of raw highlights.
+            Defaults to the shared one."""
+        if len(annotations) == 0:
+            return
+        if isinstance(annotations[0], dict):
+            cols = columnar.columns(annotations, cache=cache)
+        else:
+            cols = columnar.annotation_columns(annotations)
+
+        for f in SINGLE:
+            self._cols[f].extend(self._encode(f, v) for v in cols[f])
+        for f in MULTI:
+            rows, codes = self._flat[f]
+            for r, values in enumerate(cols[f], self.rows):
+                for v in values:
+                    rows.append(r)
+                    codes.append(self._encode(f, v))
+        self._day.extend(t.toordinal() for t in cols['last_update'])
+        self.rows += len(cols['id'])
+
+    def _encode(self, field, value):
+        if value is None:
+            return -1
+        codes = self._codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._values[field])
+            self._values[field].append(value)
+        return code
+
+    def _bucket(self, kind):
+        days = self._day
+        if kind == "day":
+            return days, lambda d: date.fromordinal(d).isoformat()
+        if kind == "week":
+            # weeks starting on monday (ordinal 1 was a monday)
+            return ([(d - 1) // 7 for d in days],
+                    lambda w: date.fromordinal(w * 7 + 1).isoformat())
+        if kind == "month":
+            # turn each distinct day into a month once, then look them up
+            lookup = {d: date.fromordinal(d) for d in set(days)}
+            lookup = {d: t.year * 12 + t.month - 1 for d, t in lookup.items()}
+            return ([lookup[d] for d in days],
+                    lambda m: f"{m // 12}-{m % 12 + 1:02d}")
+        lookup = {d: date.fromordinal(d).year for d in set(days)}
+        return [lookup[d] for d in days], str
+
+    def count(self, by, where=None):
+        """Counts annotations in each group.
+
+        Parameters
+        -----------
+        by : string/list
+            Field(s) to group by. Any of type, color, publication, locale,
+            tags, folders_id, year, month, week, day.
+        where : dict
+            Only count annotations whose field equals the value, ie
+            {"type": "highlight"}. Only single valued fields (type, color,
+            publication, locale) can be used. Defaults to None.
+
+        Returns
+        --------
+        Counter of group (or tuple of groups when grouping by multiple
+        fields) to count. Annotations with no value for a field (ie no
+        color on a journal) are grouped under None, and annotations with
+        no tags/folders aren't counted when grouping by them."""
+        single = isinstance(by, str)
+        fields = [by] if single else list(by)
+        for f in fields:
+            if f not in SINGLE + MULTI + BUCKETS:
+                raise ValueError(f"Can't group by {f}")
+
+        rows = None
+        for f, value in (where or {}).items():
+            if f not in SINGLE:
+                raise ValueError(f"Can't filter by {f}")
+            code = self._codes[f].get(value)
+            col = self._cols[f]
+            keep = set(i for i, c in enumerate(col) if c == code) \
+                if code is not None else set()
+            rows = keep if rows is None else rows & keep
+
+        # if grouping by tags/folders, each row shows up once per tag
+        multi = [f for f in fields if f in MULTI]
+        if len(multi) > 1:
+            raise ValueError("Can only group by one of tags or folders_id")
+        if len(multi) == 1:
+            index, flat = self._flat[multi[0]]
+            if rows is not None:
+                keep = [i for i, r in enumerate(index) if r in rows]
+                index = _gather(index, keep)
+                flat = _gather(flat, keep)
+        else:
+            index = range(self.rows) if rows is None else sorted(rows)
+            flat = None
+
+        columns = []
+        decoders = []
+        for f in fields:
+            if f in MULTI:
+                columns.append(flat)
+                decoders.append(self._values[f].__getitem__)
+                continue
+            if f in SINGLE:
+                col = self._cols[f]
+                decoders.append(self._decoder(f))
+            else:
+                col, decode = self._bucket(f)
+                decoders.append(decode)
+            if isinstance(index, range) and len(index) == len(col):
+                columns.append(col)
+            else:
+                columns.append(_gather(col, index))
+
+        counts = Counter(zip(*columns))
+        out = Counter()
+        for key, n in counts.items():
+            key = tuple(d(k) for d, k in zip(decoders, key))
+            out[key[0] if single else key] = n
+        return out
+
+    def _decoder(self, field):
+        values = self._values[field]
+        return lambda c: None if c == -1 else values[c]
+
+    def __len__(self):
+        return self.rows
@@ -1,9 +1,11 @@
 from ldsnotes.content import Content, clean_html
 import re
+import hashlib
+from sys import intern
 from datetime import datetime
 
 
-def make_annotation(json):
+def make_annotation(json, cache=None, session=None, pool=None, fetch=None):
     # fetch all context stuff (do it all at once to be faster) # TODO: Reparse
     # this, this is unreadable
     uris = []
@@ -12,15 +14,22 @@ def make_annotation(json):
             uris += [f"/{j['locale']}{i['uri']}" for i in j['highlight']['content']]  # noqa: E501
         if 'refs' in j:
             uris += [f"/{j['locale']}{i['uri']}" for i in j['refs']]
-    content_jsons = Content.fetch(uris, json=True) if len(uris) != 0 else []
-    # re-sort uris
-    uris = [j['uri'] for j in content_jsons]
+    if fetch is None:
+        fetch = Content.fetch
+    content_jsons = fetch(uris, json=True, cache=cache,
+                          session=session) if len(uris) != 0 else []
+    # look up content by uri
+    content_jsons = dict(zip(uris, content_jsons))
+
+    # cleaned content is shared between every highlight on the same verses
+    if pool is None:
+        pool = {}
 
     # put it back together
     annotations = []
     for j in json:
         if j['type'] == "bookmark":
-            annotations.append(Bookmark(j))
+            annotations.append(Bookmark(j, pool))
 
         elif j['type'] == "journal":
             annotations.append(Journal(j))
@@ -29,19 +38,19 @@ def make_annotation(json):
             content = []
             for i in j['highlight']['content']:
                 content.append(
-                    content_jsons[uris.index(f"/{j['locale']}{i['uri']}")])
-            annotations.append(Highlight(j, content))
+                    content_jsons[f"/{j['locale']}{i['uri']}"])
+            annotations.append(Highlight(j, content, pool))
 
         elif j['type'] == 'reference':
             content = []
             for i in j['highlight']['content']:
                 content.append(
-                    content_jsons[uris.index(f"/{j['locale']}{i['uri']}")])
+                    content_jsons[f"/{j['locale']}{i['uri']}"])
             ref_content = []
             for i in j['refs']:
                 ref_content.append(
-                    content_jsons[uris.index(f"/{j['locale']}{i['uri']}")])
-            annotations.append(Reference(j, content, ref_content))
+                    content_jsons[f"/{j['locale']}{i['uri']}"])
+            annotations.append(Reference(j, content, ref_content, pool))
 
         else:
             raise ValueError("Unknown Type of note")
@@ -52,6 +61,29 @@ def make_annotation(json):
         return annotations
 
 
+def _shared_content(content_jsons, pool):
+    """Cleans content of each verse/paragraph, reusing strings already in
+    pool so highlights on the same verses point at the same strings.
+
+    Returns the list of cleaned verses and them joined together."""
+    sep_content = []
+    for j in content_jsons:
+        key = ("c", j['uri'])
+        if key not in pool:
+            pool[key] = clean_html(j['content'][0]['markup'])
+        sep_content.append(pool[key])
+
+    key = ("j",) + tuple(j['uri'] for j in content_jsons)
+    if key not in pool:
+        pool[key] = "\n".join(sep_content).replace("#", "")
+    return sep_content, pool[key]
+
+
+def _share(text, pool):
+    """Returns the copy of text already in pool (adding it if it's new)."""
+    return pool.setdefault(text, text)
+
+
 class Annotation:
     """Base class for all annotations.
 
@@ -64,12 +96,19 @@ class Annotation:
     last_update : datetime
         Last time annotation was edited.
     id : string
-        Id of annotation."""
+        Id of annotation.
+    fingerprint : string
+        Hash of everything about the annotation except last_update (note,
+        tags, folders, content, highlight, etc). Only changes when something
+        you can see changes."""
+    __slots__ = ('tags', 'folders_id', 'last_update', 'id')
+    # fields hashed by fingerprint, added to by each subclass
+    _fingerprinted = ('tags', 'folders_id', 'id')
 
     def __init__(self, json):
-        # pull out other info
-        self.tags = json['tags']
-        self.folders_id = [i['id'] for i in json['folders']]
+        # pull out other info (interned as they repeat across annotations)
+        self.tags = [intern(t) for t in json['tags']]
+        self.folders_id = [intern(i['id']) for i in json['folders']]
 
         # pull out last updated date
         self.last_update = datetime.fromisoformat(json["lastUpdated"])
@@ -77,6 +116,22 @@ class Annotation:
         # pull out id
         self.id = json['id']
 
+    @property
+    def fingerprint(self):
+        h = hashlib.blake2b(type(self).__name__.encode(), digest_size=16)
+        names = sorted(n for c in type(self).__mro__
+                       for n in c.__dict__.get('_fingerprinted', ()))
+        for n in names:
+            value = getattr(self, n, None)
+            if value is None:
+                value = "\x00"
+            elif isinstance(value, (list, tuple)):
+                value = "\x1e".join(str(v) for v in value)
+            else:
+                value = str(value)
+            h.update(b"\x1f" + n.encode() + b"=" + value.encode())
+        return h.hexdigest()
+
 
 class Bookmark(Annotation):
     """A bookmark annotation. Inherits from annotation.
@@ -100,23 +155,27 @@ class Bookmark(Annotation):
     url : string
         Url to bookmark location.
     """
+    __slots__ = ('headline', 'reference', 'publication', 'url')
+    _fingerprinted = __slots__
 
-    def __init__(self, json):
+    def __init__(self, json, pool=None):
         super().__init__(json)
+        if pool is None:
+            pool = {}
 
         # name of article ie name of conference talk or Helaman 3
-        self.headline = json['bookmark']['name']
+        self.headline = _share(json['bookmark']['name'], pool)
 
         # full reference for scriptures like Helaman 3:29
-        self.reference = json['bookmark']['reference']
+        self.reference = _share(json['bookmark']['reference'], pool)
 
         # refers to book (ie GC 2020, or BOM)
-        self.publication = json['bookmark']['publication']
+        self.publication = intern(json['bookmark']['publication'])
 
         # pull out url to highlight
         lang = json['locale']
-        self.url = "https://www.churchofjesuschrist.org" + \
-            json['bookmark']['uri'] + "?lang=" + lang
+        self.url = _share("https://www.churchofjesuschrist.org" +
+                          json['bookmark']['uri'] + "?lang=" + lang, pool)
 
     def __print__(self):
         return "(Bookmark) " + self.reference
@@ -140,6 +199,8 @@ class Journal(Annotation):
         Title of journal entry.
     note : string
         Actual note taken."""
+    __slots__ = ('note', 'title')
+    _fingerprinted = __slots__
 
     def __init__(self, json):
         super().__init__(json)
@@ -192,26 +253,30 @@ class Highlight(Journal):
         Portion of verse that's been highlighted.
     url : string
         Url to verse/paragraph(s)
+    uris : tuple
+        Uri of each verse/paragraph being highlighted.
     headline : string
         Name of article ie name of conference talk or Helaman 3.
     reference : string
         Full reference for scriptures like Helaman 3:29.
     publication : string
         Refers to book (ie GC 2020 or BoM)."""
+    __slots__ = ('color', 'content', 'hl', 'url', 'uris',
+                 'headline', 'reference', 'publication')
+    _fingerprinted = __slots__
 
-    def __init__(self, json, content_jsons):
+    def __init__(self, json, content_jsons, pool=None):
         super().__init__(json)
+        if pool is None:
+            pool = {}
 
         # get highlight color
-        self.color = json['highlight']['content'][0]['color']
+        self.color = intern(json['highlight']['content'][0]['color'])
         # Some notes don't actually have style
         # self.style = json['highlight']['content'][0]['style']
 
         # pull out content
-        sep_content = []
-        for j in content_jsons:
-            sep_content.append(clean_html(j['content'][0]['markup']))
-        self.content = "\n".join(sep_content).replace("#", "")
+        sep_content, self.content = _shared_content(content_jsons, pool)
 
         # pull out highlight
         sep_hl = []
@@ -245,17 +310,22 @@ class Highlight(Journal):
         if len(json['highlight']['content']) > 1:
             end_p = json['highlight']['content'][-1]['uri'].split('.')[-1]
             self.url += "-" + end_p
-        self.url += "?lang=" + lang
+        self.url = _share(self.url + "?lang=" + lang, pool)
+        # url only gives the first and last verse, so keep every uri
+        self.uris = tuple(_share(c['uri'], pool)
+                          for c in json['highlight']['content'])
 
         # name of article ie name of conference talk or Helaman 3
-        self.headline = clean_html(content_jsons[0]['headline'])
+        self.headline = _share(
+            clean_html(content_jsons[0]['headline']), pool)
 
         # full reference for scriptures like Helaman 3:29
-        self.reference = clean_html(
-            content_jsons[0]['referenceURIDisplayText'])
+        self.reference = _share(clean_html(
+            content_jsons[0]['referenceURIDisplayText']), pool)
 
         # refers to book (ie GC 2020, or BOM)
-        self.publication = clean_html(content_jsons[0]['publication'])
+        self.publication = intern(
+            clean_html(content_jsons[0]['publication']))
 
     def __print__(self):
         return "(Highlight) " + self.hl
@@ -313,17 +383,24 @@ class Reference(Highlight):
     ref_reference : string
         Reference of reference. See reference for examples.
     ref_publication : string
-        Publication of reference. See publication for examples."""
-
-    def __init__(self, json, hl_json, ref_json):
-        super().__init__(json, hl_json)
+        Publication of reference. See publication for examples.
+    ref_url : string
+        Url to verse/paragraph(s) that are linked to.
+    uris : tuple
+        Uri of each verse/paragraph being highlighted.
+    ref_uris : tuple
+        Uri of each verse/paragraph that's linked to."""
+    __slots__ = ('ref_content', 'ref_url', 'ref_headline',
+                 'ref_reference', 'ref_publication', 'ref_uris')
+    _fingerprinted = __slots__
+
+    def __init__(self, json, hl_json, ref_json, pool=None):
+        if pool is None:
+            pool = {}
+        super().__init__(json, hl_json, pool)
 
         # pull out reference content
-        # pull out content
-        sep_content = []
-        for j in ref_json:
-            sep_content.append(clean_html(j['content'][0]['markup']))
-        self.ref_content = "\n".join(sep_content).replace("#", "")
+        _, self.ref_content = _shared_content(ref_json, pool)
 
         # pull out url to reference
         lang = json['locale']
@@ -332,16 +409,20 @@ class Reference(Highlight):
         if len(json['highlight']['content']) > 1:
             end_p = json['refs'][-1]['uri'].split('.')[-1]
             self.ref_url += "-" + end_p
-        self.ref_url += "?lang=" + lang
+        self.ref_url = _share(self.ref_url + "?lang=" + lang, pool)
+
+        # ref_url only gives the first and last verse, so keep every uri
+        self.ref_uris = tuple(_share(r['uri'], pool) for r in json['refs'])
 
         # name of article ie name of conference talk or Helaman 3
-        self.ref_headline = clean_html(ref_json[0]['headline'])
+        self.ref_headline = _share(clean_html(ref_json[0]['headline']), pool)
 
         # full reference for scriptures like Helaman 3:29
-        self.ref_reference = clean_html(ref_json[0]['referenceURIDisplayText'])
+        self.ref_reference = _share(
+            clean_html(ref_json[0]['referenceURIDisplayText']), pool)
 
         # refers to book (ie GC 2020, or BOM)
-        self.ref_publication = clean_html(ref_json[0]['publication'])
+        self.ref_publication = intern(clean_html(ref_json[0]['publication']))
 
     def __print__(self):
         return "(Reference) " + self.hl
@@ -0,0 +1,125 @@
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ldsnotes import content
+from ldsnotes.coalesce import ContentCoalescer
+from ldsnotes.note import Notes
+
+AccountSummary = namedtuple(
+    "AccountSummary",
+    ["name", "result", "error", "login_time", "job_time", "total_time",
+     "cache_stats"])
+AccountSummary.__doc__ = """Summary of one account's run.
+
+Attributes
+-----------
+name : string
+    Name of account (see BatchRunner).
+result : object
+    Whatever the job returned, or None if it failed.
+error : string
+    Traceback if login or the job failed, otherwise None.
+login_time : float
+    Seconds spent logging in.
+job_time : float
+    Seconds spent running the job.
+total_time : float
+    Seconds from starting the account to finishing it.
+cache_stats : dict
+    Notes.cache_stats once the job finished. Content counts are for the
+    cache shared by every account."""
+
+
+class BatchRunner:
+    """Runs the same job for many accounts concurrently.
+
+    Each account gets its own Notes (and so its own cookies and tag/folder
+    cache), but they all share one content cache and one connection pool,
+    so popular verses are only pulled once.
+
+    Parameters
+    -----------
+    accounts : list
+        Tokens (strings) or dictionaries of arguments to Notes (ie username
+        and password, or token). Dictionaries can also have a "name" to
+        label the account with in the summary.
+    job : function
+        Called with each account's Notes object. Whatever it returns is put
+        in the summary.
+    max_workers : int
+        Max number of accounts to run at once. Defaults to 4.
+    content_cache : ResponseCache
+        Content cache shared by all accounts. Defaults to
+        ldsnotes.content.CACHE.
+    headless : bool
+        Whether to run selenium headless when logging in. Defaults to True.
+    coalesce : bool
+        Whether to combine content requests made at the same time by
+        different accounts (see ContentCoalescer). Defaults to True.
+
+    Examples
+    ---------
+    >>> runner = BatchRunner([token1, token2], lambda n: n.tags)
+    >>> for s in runner.run():
+    ...     print(s.name, s.total_time, s.error)
+    """
+
+    def __init__(self, accounts, job, max_workers=4, content_cache=None,
+                 headless=True, coalesce=True):
+        self.accounts = accounts
+        self.job = job
+        self.max_workers = max_workers
+        self.headless = headless
+        self.content_cache = content.CACHE if content_cache is None \
+            else content_cache
+
+        # one connection pool big enough for every worker
+        self.adapter = HTTPAdapter(pool_maxsize=max_workers)
+        self.content_session = requests.Session()
+        self.content_session.mount("https://", self.adapter)
+        self.coalescer = ContentCoalescer() if coalesce else None
+
+    def run(self):
+        """Runs job for every account.
+
+        Returns
+        --------
+        List of AccountSummary, in the same order as accounts."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(self._run_one, range(len(self.accounts)),
+                                 self.accounts))
+
+    def _run_one(self, i, account):
+        if isinstance(account, str):
+            kwargs = {"token": account}
+        else:
+            kwargs = dict(account)
+        name = kwargs.pop("name", kwargs.get("username", f"account {i}"))
+        kwargs.setdefault("headless", self.headless)
+
+        start = perf_counter()
+        notes = None
+        result = error = None
+        login_time = job_time = 0.0
+        try:
+            notes = Notes(content_cache=self.content_cache,
+                          content_session=self.content_session,
+                          adapter=self.adapter, coalescer=self.coalescer,
+                          **kwargs)
+            login_time = perf_counter() - start
+
+            result = self.job(notes)
+        except Exception:
+            error = traceback.format_exc()
+        if notes is not None:
+            job_time = perf_counter() - start - login_time
+
+        return AccountSummary(
+            name=name, result=result, error=error, login_time=login_time,
+            job_time=job_time, total_time=perf_counter() - start,
+            cache_stats=None if notes is None else notes.cache_stats)
@@ -0,0 +1,167 @@
+import shelve
+import threading
+from collections import OrderedDict
+
+import requests
+
+
+class ResponseCache:
+    """Local store for responses pulled from lds.org.
+
+    Entries are kept in memory by default (optionally capped to the
+    most recently used ``maxsize``), or on disk if a path is given.
+
+    Parameters
+    -----------
+    path : string
+        File to persist the cache to using shelve. Defaults to None,
+        which keeps everything in memory.
+    maxsize : int
+        Max number of entries to keep in memory. Ignored if path is given.
+        Defaults to None (unbounded).
+
+    Attributes
+    -----------
+    stats : dict
+        Counts of hits (served from the cache, including after a 304),
+        misses (full download), revalidated (server returned 304) and
+        stored entries."""
+
+    def __init__(self, path=None, maxsize=None):
+        self.path = path
+        self.maxsize = maxsize
+        if path is None:
+            self._store = OrderedDict()
+        else:
+            self._store = shelve.open(path)
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0}
+
+    def get(self, key, count=True):
+        """Returns entry at key, or None if it isn't cached.
+
+        Parameters
+        -----------
+        key : string
+            Key entry was stored with.
+        count : bool
+            Whether to count this lookup as a hit/miss. Defaults to True."""
+        with self._lock:
+            value = self._store.get(key)
+            if value is not None and self.path is None:
+                self._store.move_to_end(key)
+            if count:
+                self.stats["hits" if value is not None else "misses"] += 1
+            return value
+
+    def set(self, key, value):
+        """Stores value under key, evicting the oldest if full."""
+        with self._lock:
+            self._store[key] = value
+            self.stats["stored"] += 1
+            if self.path is None and self.maxsize is not None:
+                self._store.move_to_end(key)
+                while len(self._store) > self.maxsize:
+                    self._store.popitem(last=False)
+
+    def record(self, stat):
+        """Bumps one of the statistics, ie "revalidated" after a 304."""
+        with self._lock:
+            self.stats[stat] += 1
+
+    def clear(self):
+        """Removes all entries and resets statistics."""
+        with self._lock:
+            self._store.clear()
+            for k in self.stats:
+                self.stats[k] = 0
+
+    def close(self):
+        """Flushes cache to disk if it's file backed."""
+        if self.path is not None:
+            self._store.close()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._store
+
+    def __len__(self):
+        with self._lock:
+            return len(self._store)
+
+
+class CachedSession(requests.Session):
+    """requests.Session that revalidates GET requests.
+
+    Any response that comes with an ETag or Last-Modified header is saved,
+    and the next time the same url/params is requested, it's sent with
+    If-None-Match/If-Modified-Since. If the server says nothing changed
+    (304), the saved body is returned instead.
+
+    Parameters
+    -----------
+    cache : ResponseCache
+        Where to save responses. Defaults to a new in memory cache.
+    cacheable : function
+        Called with (url, params) of each GET, and returns whether it should
+        be revalidated/saved. Others are sent as normal and not counted.
+        Defaults to None, which caches every GET."""
+
+    def __init__(self, cache=None, cacheable=None):
+        super().__init__()
+        self.cache = ResponseCache() if cache is None else cache
+        self.cacheable = cacheable
+
+    @staticmethod
+    def _key(url, params):
+        if not params:
+            return url
+        return url + "?" + "&".join(
+            f"{k}={params[k]}" for k in sorted(params))
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        if method.upper() != "GET" or (self.cacheable is not None and
+                                       not self.cacheable(url, params)):
+            return super().request(method, url, params=params,
+                                   headers=headers, **kwargs)
+
+        key = self._key(url, params)
+        entry = self.cache.get(key, count=False)
+
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry['etag'] is not None:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified'] is not None:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        resp = super().request(method, url, params=params,
+                               headers=headers, **kwargs)
+
+        if resp.status_code == 304 and entry is not None:
+            self.cache.record("hits")
+            self.cache.record("revalidated")
+            return self._from_entry(resp, entry)
+
+        self.cache.record("misses")
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if resp.ok and (etag is not None or last_modified is not None):
+            self.cache.set(key, {"etag": etag,
+                                 "last_modified": last_modified,
+                                 "content": resp.content,
+                                 "encoding": resp.encoding})
+        return resp
+
+    @staticmethod
+    def _from_entry(resp, entry):
+        # rebuild a full response from what we saved last time
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.headers = resp.headers
+        cached.url = resp.url
+        cached.request = resp.request
+        cached.encoding = entry['encoding']
+        cached._content = entry['content']
+        cached.from_cache = True
+        return cached
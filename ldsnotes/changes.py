@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+Diff = namedtuple("Diff", ["created", "updated", "deleted", "unchanged"])
+Diff.__doc__ = """Difference between two snapshots of an account.
+
+Attributes
+-----------
+created : list
+    Ids of annotations only in the new snapshot.
+updated : list
+    Ids of annotations in both whose fingerprint changed.
+deleted : list
+    Ids of annotations only in the old snapshot.
+unchanged : list
+    Ids of annotations in both with the same fingerprint."""
+
+
+def fingerprints(annotations):
+    """Makes a snapshot of annotations to compare against later.
+
+    Parameters
+    -----------
+    annotations : list
+        Bookmark/Journal/Highlight/Reference objects.
+
+    Returns
+    --------
+    Dictionary of annotation id to fingerprint. It's plain strings, so it
+    can be saved with json between runs."""
+    return {a.id: a.fingerprint for a in annotations}
+
+
+def diff(old, new):
+    """Compares two snapshots in one pass over each.
+
+    Parameters
+    -----------
+    old : dict/list
+        Snapshot from fingerprints, or list of annotations.
+    new : dict/list
+        Snapshot from fingerprints, or list of annotations.
+
+    Returns
+    --------
+    Diff
+
+    Examples
+    ---------
+    >>> before = fingerprints(notes)
+    >>> # ... next run ...
+    >>> changed = diff(before, fingerprints(notes))
+    >>> for a in notes:
+    ...     if a.id in changed.created or a.id in changed.updated:
+    ...         write_markdown(a)
+    """
+    if not isinstance(old, dict):
+        old = fingerprints(old)
+    if not isinstance(new, dict):
+        new = fingerprints(new)
+
+    created, updated, unchanged = [], [], []
+    for i, fp in new.items():
+        before = old.get(i)
+        if before is None:
+            created.append(i)
+        elif before != fp:
+            updated.append(i)
+        else:
+            unchanged.append(i)
+    deleted = [i for i in old if i not in new]
+
+    return Diff(created, updated, deleted, unchanged)
@@ -0,0 +1,441 @@
+"""Command line interface, installed as ``ldsnotes``.
+
+Examples
+---------
+Export every highlight as markdown, 4 pages in flight and 4 parsing threads::
+
+    $ ldsnotes export --token-file .token --type highlight \\
+        --format markdown --output notes/ --concurrency 4 --workers 4
+
+Search a few tags at once::
+
+    $ ldsnotes search --tag Faith --tag Hope --folder Journal
+
+Push edits made to an exported jsonl file::
+
+    $ ldsnotes export --format jsonl --output notes.jsonl
+    $ ldsnotes sync notes.jsonl     # first time records what's on lds.org
+    $ vim notes.jsonl
+    $ ldsnotes sync notes.jsonl     # pushes your edits
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+import requests
+
+from ldsnotes import columnar
+from ldsnotes.annotations import Highlight
+from ldsnotes.cache import ResponseCache
+from ldsnotes.coalesce import ContentCoalescer
+from ldsnotes.changes import diff, fingerprints
+from ldsnotes.note import Notes
+from ldsnotes.sync import SyncEngine
+
+TYPES = ["bookmark", "highlight", "journal", "reference"]
+
+
+class Progress:
+    """Keeps track of requests/notes per second and time spent in each
+    stage, and prints a live status line to stderr.
+
+    Parameters
+    -----------
+    enabled : bool
+        Whether to print the status line. Defaults to True."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.start = perf_counter()
+        self.requests = 0
+        self.notes = 0
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._last = 0.0
+
+    def hook(self, resp, *args, **kwargs):
+        """requests response hook to count requests."""
+        with self._lock:
+            self.requests += 1
+        self.show()
+
+    def add_notes(self, n):
+        with self._lock:
+            self.notes += n
+        self.show()
+
+    @contextmanager
+    def stage(self, name):
+        """Times everything in the with block under name. Safe to use from
+        multiple threads; times are added together."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                total, count = self.stages.get(name, (0.0, 0))
+                self.stages[name] = (total + perf_counter() - start,
+                                     count + 1)
+
+    def show(self, force=False):
+        now = perf_counter()
+        if not self.enabled or (not force and now - self._last < 0.2):
+            return
+        self._last = now
+        elapsed = max(now - self.start, 1e-9)
+        sys.stderr.write(
+            f"\r{self.notes} notes, {self.requests} requests "
+            f"({self.notes / elapsed:.1f} notes/s, "
+            f"{self.requests / elapsed:.1f} req/s, {elapsed:.1f}s)")
+        sys.stderr.flush()
+
+    def finish(self):
+        if self.enabled:
+            self.show(force=True)
+            sys.stderr.write("\n")
+
+    def report(self):
+        """Returns per stage timing report as a string."""
+        elapsed = perf_counter() - self.start
+        lines = [f"{'stage':<14}{'calls':>8}{'seconds':>10}{'%':>7}"]
+        for name, (total, count) in sorted(self.stages.items(),
+                                           key=lambda s: -s[1][0]):
+            lines.append(f"{name:<14}{count:>8}{total:>10.3f}"
+                         f"{100 * total / elapsed:>7.1f}")
+        lines.append(f"{'wall':<14}{'':>8}{elapsed:>10.3f}")
+        return "\n".join(lines)
+
+
+def _bounded_map(pool, fn, items, window):
+    # like pool.map, but only keeps window items in flight at once
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _notes(args, progress):
+    if args.cache is not None:
+        os.makedirs(args.cache, exist_ok=True)
+        cache = ResponseCache(path=os.path.join(args.cache, "http"))
+        content_cache = ResponseCache(
+            path=os.path.join(args.cache, "content"))
+    else:
+        cache = content_cache = None
+
+    token = args.token or os.environ.get("LDSNOTES_TOKEN")
+    if token is None and args.token_file is not None:
+        with open(args.token_file) as f:
+            token = f.read().strip()
+    username = args.username or os.environ.get("LDSNOTES_USERNAME")
+    password = args.password or os.environ.get("LDSNOTES_PASSWORD")
+    if token is None and (username is None or password is None):
+        sys.exit("ldsnotes: need --token, --token-file or "
+                 "--username and --password")
+
+    with progress.stage("login"):
+        # parsing threads share content requests
+        coalescer = ContentCoalescer() if args.workers > 1 else None
+        notes = Notes(username, password, token=token,
+                      cache=cache, content_cache=content_cache,
+                      content_session=requests.Session(),
+                      coalescer=coalescer)
+    notes.session.hooks['response'].append(progress.hook)
+    notes.content_session.hooks['response'].append(progress.hook)
+    return notes
+
+
+def _close(notes):
+    notes.session.cache.close()
+    notes.content_cache.close()
+
+
+def _pages(notes, args, progress):
+    pages = notes.pages(args.keyword, args.tag, args.folder, args.type,
+                        page_size=args.page_size,
+                        concurrency=args.concurrency)
+    while True:
+        with progress.stage("fetch"):
+            page = next(pages, None)
+        if page is None:
+            return
+        yield page
+
+
+def _parse(notes, progress):
+    def parse(page):
+        with progress.stage("parse"):
+            parsed = notes._make(page)
+        if not isinstance(parsed, list):
+            parsed = [parsed]
+        return parsed
+    return parse
+
+
+def _markdown(a):
+    lines = []
+    title = getattr(a, 'title', "") or getattr(a, 'reference', "") or a.id
+    lines.append(f"# {title}\n")
+    if hasattr(a, 'reference'):
+        lines.append(f"[{a.reference}]({a.url})\n")
+    if isinstance(a, Highlight):
+        lines.append(a.markdown() + "\n")
+    if getattr(a, 'note', ""):
+        lines.append(a.note + "\n")
+    if len(a.tags) != 0:
+        lines.append(" ".join(f"#{t.replace(' ', '_')}" for t in a.tags))
+    return "\n".join(lines) + "\n"
+
+
+def _output(out, **kwargs):
+    # stdout is left open when done
+    if out in (None, "-"):
+        return nullcontext(sys.stdout)
+    return open(out, "w", **kwargs)
+
+
+def _query_key(args):
+    # which export a set of markdown fingerprints came from
+    return json.dumps([args.keyword, args.tag, args.folder,
+                       sorted(args.type)])
+
+
+def export(args):
+    progress = Progress(not args.quiet)
+    notes = _notes(args, progress)
+    pages = _pages(notes, args, progress)
+    out = args.output
+
+    if args.format == "jsonl":
+        with _output(out) as f:
+            for page in pages:
+                with progress.stage("write"):
+                    for j in page:
+                        f.write(json.dumps(j) + "\n")
+                progress.add_notes(len(page))
+
+    elif args.format in ("csv", "parquet"):
+        def cols(page):
+            with progress.stage("parse"):
+                return columnar.columns(page, cache=notes.content_cache,
+                                        session=notes.content_session)
+
+        writer = None
+        if args.format == "parquet" and out in (None, "-"):
+            sys.exit("ldsnotes: parquet export needs --output file")
+        f = _output(out, newline="") if args.format == "csv" \
+            else nullcontext()
+        # close whatever was written, even if a page fails
+        with f, ThreadPoolExecutor(max_workers=args.workers) as pool:
+            try:
+                for c in _bounded_map(pool, cols, pages, 2 * args.workers):
+                    with progress.stage("write"):
+                        if args.format == "csv":
+                            if writer is None:
+                                writer = csv.writer(f)
+                                writer.writerow(columnar.COLUMNS)
+                            for row in zip(*[c[k]
+                                             for k in columnar.COLUMNS]):
+                                writer.writerow([";".join(v) if isinstance(
+                                    v, list) else v for v in row])
+                        else:
+                            pq = columnar._import("pyarrow.parquet").parquet
+                            if writer is None:
+                                writer = pq.ParquetWriter(out,
+                                                          columnar.schema())
+                            writer.write_batch(columnar.record_batch(c))
+                    progress.add_notes(len(c['id']))
+            finally:
+                if args.format == "parquet" and writer is not None:
+                    writer.close()
+
+    elif args.format == "markdown":
+        if out is None:
+            sys.exit("ldsnotes: markdown export needs --output directory")
+        os.makedirs(out, exist_ok=True)
+        # fingerprints are kept per query, so a narrower export into the
+        # same directory doesn't remove notes a broader one wrote
+        prints_path = os.path.join(out, ".fingerprints.json")
+        queries = {}
+        if os.path.exists(prints_path):
+            with open(prints_path) as f:
+                # older exports kept one flat dictionary, start over
+                queries = {k: v for k, v in json.load(f).items()
+                           if isinstance(v, dict)}
+        key = _query_key(args)
+        old = queries.get(key, {})
+
+        # only rewrite files whose annotation changed since last export
+        new = {}
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for parsed in _bounded_map(pool, _parse(notes, progress),
+                                       pages, 2 * args.workers):
+                with progress.stage("write"):
+                    prints = fingerprints(parsed)
+                    for a in parsed:
+                        if old.get(a.id) != prints[a.id]:
+                            with open(os.path.join(out, f"{a.id}.md"),
+                                      "w") as f:
+                                f.write(_markdown(a))
+                    new.update(prints)
+                progress.add_notes(len(parsed))
+
+        queries[key] = new
+        others = set(i for k, prints in queries.items() if k != key
+                     for i in prints)
+        for i in diff(old, new).deleted:
+            path = os.path.join(out, f"{i}.md")
+            if i not in others and os.path.exists(path):
+                os.remove(path)
+        with open(prints_path, "w") as f:
+            json.dump(queries, f)
+
+    progress.finish()
+    _close(notes)
+    return progress
+
+
+def search(args):
+    progress = Progress(not args.quiet)
+    notes = _notes(args, progress)
+    with progress.stage("search"):
+        found = notes.multi_search(args.keyword, args.tag, args.folder,
+                                   args.type, start=args.start,
+                                   stop=args.stop, all_tags=args.all_tags,
+                                   max_workers=args.concurrency)
+    if not isinstance(found, list):
+        found = [found]
+    progress.add_notes(len(found))
+    progress.finish()
+    for a in found:
+        print(f"{a.last_update:%Y-%m-%d}  {a!r}")
+    _close(notes)
+    return progress
+
+
+def sync(args):
+    progress = Progress(not args.quiet)
+    notes = _notes(args, progress)
+    state = args.state or args.file + ".state"
+    with open(args.file) as f:
+        local = [json.loads(line) for line in f if line.strip()]
+
+    if not os.path.exists(state):
+        engine = SyncEngine(notes)
+        engine.track(local)
+        engine.save(state)
+        progress.finish()
+        print(f"Tracking {len(local)} annotations in {state}. Edit "
+              f"{args.file} and run sync again to push changes.")
+    else:
+        engine = SyncEngine.load(notes, state, batch_size=args.batch_size)
+        with progress.stage("push"):
+            result = engine.push(local)
+        engine.save(state)
+        progress.finish()
+        print(f"Pushed {len(result.pushed)} annotations in "
+              f"{result.requests} requests.")
+        for c in result.conflicts:
+            print(f"Conflict: {c.id} was edited on lds.org too, "
+                  f"not pushed ({', '.join(c.local)})")
+    _close(notes)
+    return progress
+
+
+def _page_size(text):
+    if text == "auto":
+        return text
+    return int(text)
+
+
+def parser():
+    """Returns the argparse parser for the ldsnotes command."""
+    common = argparse.ArgumentParser(add_help=False)
+    auth = common.add_argument_group("login")
+    auth.add_argument("--token", help="oauth_id_token cookie "
+                      "(or set LDSNOTES_TOKEN)")
+    auth.add_argument("--token-file", help="file holding the token")
+    auth.add_argument("--username", help="or set LDSNOTES_USERNAME")
+    auth.add_argument("--password", help="or set LDSNOTES_PASSWORD")
+
+    perf = common.add_argument_group("throughput")
+    perf.add_argument("--page-size", type=_page_size, default="auto",
+                      help="annotations per request, or auto to adjust "
+                      "it for speed (default auto)")
+    perf.add_argument("--concurrency", type=int, default=2,
+                      help="requests in flight at once (default 2)")
+    perf.add_argument("--workers", type=int, default=2,
+                      help="threads parsing pages (default 2)")
+    perf.add_argument("--cache", metavar="DIR",
+                      help="keep responses/content cached in DIR "
+                      "between runs")
+    common.add_argument("--quiet", action="store_true",
+                        help="don't show live progress")
+    common.add_argument("--profile", action="store_true",
+                        help="print time spent in each stage at the end")
+
+    query = argparse.ArgumentParser(add_help=False)
+    query.add_argument("--type", action="append", choices=TYPES,
+                       help="annotation type, can be repeated "
+                       "(default all)")
+
+    p = argparse.ArgumentParser(
+        prog="ldsnotes", description="Work with your annotations from "
+        "churchofjesuschrist.org.")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    e = sub.add_parser("export", parents=[common, query],
+                       help="export annotations")
+    e.add_argument("--keyword")
+    e.add_argument("--tag")
+    e.add_argument("--folder")
+    e.add_argument("--format", default="jsonl",
+                   choices=["jsonl", "csv", "parquet", "markdown"])
+    e.add_argument("--output", "-o",
+                   help="file (or directory for markdown), default stdout")
+    e.set_defaults(func=export)
+
+    s = sub.add_parser("search", parents=[common, query],
+                       help="search annotations")
+    s.add_argument("--keyword", action="append")
+    s.add_argument("--tag", action="append")
+    s.add_argument("--folder", action="append")
+    s.add_argument("--all-tags", action="store_true",
+                   help="require every --tag instead of any")
+    s.add_argument("--start", type=int, default=1)
+    s.add_argument("--stop", type=int, default=51)
+    s.set_defaults(func=search)
+
+    y = sub.add_parser("sync", parents=[common],
+                       help="push edits made to an exported jsonl file")
+    y.add_argument("file", help="jsonl file from export --format jsonl")
+    y.add_argument("--state", help="where to keep last known server state "
+                   "(default FILE.state)")
+    y.add_argument("--batch-size", type=int, default=50,
+                   help="annotations sent per update request (default 50)")
+    y.set_defaults(func=sync)
+
+    return p
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    if getattr(args, "type", None) is None:
+        args.type = TYPES
+    progress = args.func(args)
+    if args.profile:
+        print(progress.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
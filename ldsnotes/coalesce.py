@@ -0,0 +1,122 @@
+import threading
+from concurrent.futures import Future
+
+from ldsnotes import content
+from ldsnotes.content import Content
+
+
+class _Batch:
+    def __init__(self):
+        self.uris = []
+        self.full = threading.Event()
+
+
+class ContentCoalescer:
+    """Combines Content.fetch calls made at the same time from different
+    threads into one request.
+
+    The first thread to ask for content waits window seconds for others to
+    ask too, then sends everything that was asked for in one request. Each
+    caller gets back only what it asked for. A uri that's already being
+    pulled is waited on instead of being asked for again.
+
+    Use it anywhere Content.fetch is, or pass it to Notes so highlights
+    parsed in multiple threads share requests.
+
+    Parameters
+    -----------
+    window : float
+        Seconds to wait for other requests to join a batch. Defaults to
+        0.01.
+    max_batch : int
+        Send a batch right away once it has this many uris. Defaults to
+        500.
+
+    Attributes
+    -----------
+    stats : dict
+        Number of batches sent, uris sent, and uris that were shared with
+        another caller instead of being sent again.
+
+    Examples
+    ---------
+    >>> coalescer = ContentCoalescer()
+    >>> n = Notes(token=token, coalescer=coalescer)
+    """
+
+    def __init__(self, window=0.01, max_batch=500):
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._open = None
+        self.stats = {"batches": 0, "sent": 0, "shared": 0}
+
+    def fetch(self, uris, json=False, cache=None, session=None):
+        """Same as Content.fetch, but coalesced with other callers."""
+        if cache is None:
+            cache = content.CACHE
+        if session is None:
+            session = content.SESSION
+
+        resp = {}
+        unique = list(dict.fromkeys(uris))
+        for u in unique:
+            hit = cache.get(u)
+            if hit is not None:
+                resp[u] = hit
+
+        waiting = {}
+        leading = []
+        with self._lock:
+            for u in unique:
+                if u in resp:
+                    continue
+                if u in self._inflight:
+                    self.stats["shared"] += 1
+                else:
+                    if self._open is None:
+                        self._open = _Batch()
+                        leading.append(self._open)
+                    self._open.uris.append(u)
+                    self._inflight[u] = Future()
+                    if len(self._open.uris) >= self.max_batch:
+                        self._open.full.set()
+                        self._open = None
+                waiting[u] = self._inflight[u]
+
+        for batch in leading:
+            self._send(batch, session)
+
+        for u, future in waiting.items():
+            resp[u] = future.result()
+            cache.set(u, resp[u])
+
+        if json:
+            return [resp[u] for u in uris]
+        else:
+            return [Content(resp[u]) for u in uris]
+
+    def _send(self, batch, session):
+        # give other threads a chance to join, unless the batch fills up
+        batch.full.wait(self.window)
+        with self._lock:
+            if self._open is batch:
+                self._open = None
+            futures = [self._inflight[u] for u in batch.uris]
+            self.stats["batches"] += 1
+            self.stats["sent"] += len(batch.uris)
+
+        try:
+            pulled = content.post(batch.uris, session)
+            results = [pulled[u] for u in batch.uris]
+        except Exception as e:
+            for f in futures:
+                f.set_exception(e)
+        else:
+            for f, r in zip(futures, results):
+                f.set_result(r)
+
+        with self._lock:
+            for u in batch.uris:
+                del self._inflight[u]
@@ -0,0 +1,171 @@
+"""Columnar (Arrow/pandas) export of annotations.
+
+Columns are built straight from the raw page json, without making a
+Bookmark/Journal/Highlight/Reference for each row. pyarrow is required, and
+pandas as well for DataFrames (``pip install ldsnotes[arrow]``)."""
+from datetime import datetime, timezone
+
+from ldsnotes.content import Content, clean_html
+
+COLUMNS = ["id", "type", "last_update", "locale", "tags", "folders_id",
+           "color", "publication", "headline", "reference", "uri",
+           "title", "note"]
+
+
+def _import(name):
+    try:
+        return __import__(name)
+    except ImportError:
+        raise ImportError(f"Columnar export requires {name}, install it "
+                          "with pip install ldsnotes[arrow]") from None
+
+
+def schema():
+    """Returns the pyarrow schema of every batch. Type, locale, tags,
+    folders, color and publication are dictionary encoded, so they turn into
+    categoricals in pandas."""
+    pa = _import("pyarrow")
+    cat = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.string()),
+        ("type", cat),
+        ("last_update", pa.timestamp("us")),
+        ("locale", cat),
+        ("tags", pa.list_(cat)),
+        ("folders_id", pa.list_(cat)),
+        ("color", cat),
+        ("publication", cat),
+        ("headline", pa.string()),
+        ("reference", pa.string()),
+        ("uri", pa.string()),
+        ("title", pa.string()),
+        ("note", pa.string()),
+    ])
+
+
+def _timestamp(text):
+    # arrow wants one timezone per column, so everything is stored in UTC
+    t = datetime.fromisoformat(text)
+    if t.tzinfo is not None:
+        t = t.astimezone(timezone.utc).replace(tzinfo=None)
+    return t
+
+
+def columns(page, cache=None, session=None):
+    """Splits a page of raw annotation json into columns.
+
+    Highlights/references only carry uris, so their headline, reference and
+    publication come from the first verse/paragraph, pulled with one
+    Content.fetch for the whole page.
+
+    Parameters
+    -----------
+    page : list
+        Raw annotation dictionaries, ie from Notes.pages or
+        Notes.search(json=True).
+    cache : ResponseCache
+        Content cache to use. Defaults to the shared one.
+    session : requests.Session
+        Session to pull content with. Defaults to the shared one.
+
+    Returns
+    --------
+    Dictionary of column name to list of values."""
+    cols = {c: [] for c in COLUMNS}
+
+    uris = [f"/{j['locale']}{j['highlight']['content'][0]['uri']}"
+            for j in page if 'highlight' in j]
+    info = {}
+    if len(uris) != 0:
+        for c in Content.fetch(uris, json=True, cache=cache,
+                               session=session):
+            if c['uri'] not in info:
+                info[c['uri']] = (clean_html(c['publication']),
+                                  clean_html(c['headline']),
+                                  clean_html(c['referenceURIDisplayText']))
+
+    for j in page:
+        cols['id'].append(j['id'])
+        cols['type'].append(j['type'])
+        cols['last_update'].append(_timestamp(j['lastUpdated']))
+        cols['locale'].append(j['locale'])
+        cols['tags'].append(j['tags'])
+        cols['folders_id'].append([f['id'] for f in j['folders']])
+
+        note = j.get('note', {})
+        cols['title'].append(note.get('title', ""))
+        cols['note'].append(note.get('content', ""))
+
+        if 'highlight' in j:
+            hl = j['highlight']['content'][0]
+            uri = f"/{j['locale']}{hl['uri']}"
+            pub, headline, ref = info[uri]
+            cols['color'].append(hl['color'])
+            cols['uri'].append(hl['uri'])
+        elif 'bookmark' in j:
+            b = j['bookmark']
+            pub, headline, ref = b['publication'], b['name'], b['reference']
+            cols['color'].append(None)
+            cols['uri'].append(b['uri'])
+        else:
+            pub = headline = ref = None
+            cols['color'].append(None)
+            cols['uri'].append(None)
+        cols['publication'].append(pub)
+        cols['headline'].append(headline)
+        cols['reference'].append(ref)
+
+    return cols
+
+
+def annotation_columns(annotations):
+    """Same as columns, but from already made
+    Bookmark/Journal/Highlight/Reference objects. uri is the first verse's
+    (like columns), and locale is pulled back out of the url."""
+    cols = {c: [] for c in COLUMNS}
+    for a in annotations:
+        cols['id'].append(a.id)
+        cols['type'].append(type(a).__name__.lower())
+        cols['last_update'].append(_timestamp(a.last_update.isoformat()))
+        cols['tags'].append(a.tags)
+        cols['folders_id'].append(a.folders_id)
+        cols['title'].append(getattr(a, 'title', ""))
+        cols['note'].append(getattr(a, 'note', ""))
+        cols['color'].append(getattr(a, 'color', None))
+        cols['publication'].append(getattr(a, 'publication', None))
+        cols['headline'].append(getattr(a, 'headline', None))
+        cols['reference'].append(getattr(a, 'reference', None))
+        url = getattr(a, 'url', None)
+        if url is None:
+            cols['uri'].append(None)
+            cols['locale'].append(None)
+        else:
+            path, lang = url.split("?lang=")
+            uris = getattr(a, 'uris', None)
+            if uris:
+                cols['uri'].append(uris[0])
+            else:
+                cols['uri'].append(path.split(".org")[1])
+            cols['locale'].append(lang)
+    return cols
+
+
+def record_batch(cols):
+    """Turns columns (from columns or annotation_columns) into a
+    pyarrow.RecordBatch."""
+    pa = _import("pyarrow")
+    s = schema()
+    return pa.RecordBatch.from_arrays(
+        [pa.array(cols[f.name], type=f.type) for f in s], schema=s)
+
+
+def to_table(batches):
+    """Puts record batches together into one pyarrow.Table."""
+    pa = _import("pyarrow")
+    return pa.Table.from_batches(list(batches), schema=schema())
+
+
+def to_dataframe(batches):
+    """Puts record batches together into one pandas DataFrame."""
+    _import("pandas")
+    return to_table(batches).to_pandas()
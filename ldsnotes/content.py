@@ -1,10 +1,16 @@
 import requests
 import html.parser
 import re
+from concurrent.futures import ThreadPoolExecutor
+from ldsnotes.cache import ResponseCache
 
 H = html.parser.HTMLParser()
 CONTENT = "https://www.churchofjesuschrist.org/content/api/v2"
 
+# content is the same for everyone, so it's shared between all Notes objects
+CACHE = ResponseCache(maxsize=50000)
+SESSION = requests.Session()
+
 
 def clean_html(text):
     """Takes in html code and cleans it. Note that footnotes
@@ -37,6 +43,47 @@ def clean_html(text):
     return text.replace(u'\xa0', u' ')
 
 
+def locale_of(uri):
+    """Returns locale a content uri is in, ie eng for /eng/scriptures/..."""
+    return uri.split('/')[1]
+
+
+def post(uris, session=None):
+    """Pulls content for uris, with one request per locale (sent at the same
+    time if there's more than one).
+
+    Parameters
+    -----------
+    uris : list
+        Unique list of uris to pull.
+    session : requests.Session
+        Session to send requests with. Defaults to a shared session.
+
+    Returns
+    --------
+    Dictionary of uri to raw content dictionary."""
+    if session is None:
+        session = SESSION
+
+    by_locale = {}
+    for u in uris:
+        by_locale.setdefault(locale_of(u), []).append(u)
+
+    def send(batch):
+        return session.post(url=CONTENT, data={"uris": batch}).json()
+
+    if len(by_locale) == 1:
+        pulled = [send(uris)]
+    else:
+        with ThreadPoolExecutor(max_workers=len(by_locale)) as pool:
+            pulled = list(pool.map(send, by_locale.values()))
+
+    resp = {}
+    for p in pulled:
+        resp.update(p)
+    return resp
+
+
 class Content:
     """Class that pulls/represents content from anywhere
         on churchofjesuschrist.org/study (theoretically)
@@ -103,16 +150,24 @@ class Content:
     __repr__ = __print__
 
     @staticmethod
-    def fetch(uris, json=False):
+    def fetch(uris, json=False, cache=None, session=None):
         """Method to actually make content. This is where the magic happens.
             Requires a proper URI to fetch content.
 
+        Content that's been pulled before is served from a local cache, and
+        only the URIs that are missing are requested, one request per
+        locale.
+
         Parameters
         ----------
         uris : list
             List of URIs to pull from lds.org. See below for example.
         json : bool
             Whether to return as list of Content objects or the raw dictionaries. Most useful in debugging. Defaults to False.
+        cache : ResponseCache
+            Cache to look in/save to. Defaults to the shared ldsnotes.content.CACHE.
+        session : requests.Session
+            Session to send requests with. Defaults to a shared session.
 
         Returns
         --------
@@ -152,10 +207,75 @@ class Content:
         'uri': '/eng/scriptures/bofm/hel/3.p29'}]
         """  # noqa: E501
 
-        resp = requests.post(url=CONTENT,
-                             data={"uris": uris}).json()
+        if cache is None:
+            cache = CACHE
+        if session is None:
+            session = SESSION
+
+        resp = {}
+        unique = list(dict.fromkeys(uris))
+        for u in unique:
+            hit = cache.get(u)
+            if hit is not None:
+                resp[u] = hit
+
+        missing = [u for u in unique if u not in resp]
+        if len(missing) != 0:
+            pulled = post(missing, session)
+            for u in missing:
+                cache.set(u, pulled[u])
+                resp[u] = pulled[u]
 
         if json:
             return [resp[u] for u in uris]
         else:
             return [Content(resp[u]) for u in uris]
+
+    @staticmethod
+    def fetch_locales(uris, locales, json=False, cache=None, session=None):
+        """Pulls the same content in multiple languages at once.
+
+        Parameters
+        ----------
+        uris : list
+            URIs to pull, with or without a locale in front, ie
+            "/eng/scriptures/bofm/hel/3.p29" or "/scriptures/bofm/hel/3.p29".
+        locales : list
+            Locales to pull each one in, ie ["eng", "spa"].
+        json : bool
+            Whether to return Content objects or raw dictionaries.
+            Defaults to False.
+        cache : ResponseCache
+            See fetch.
+        session : requests.Session
+            See fetch.
+
+        Returns
+        --------
+        Dictionary of locale to a dictionary of URI (without locale) to
+        content.
+
+        Examples
+        ---------
+        >>> c = Content.fetch_locales(["/scriptures/bofm/hel/3.p29"],
+        ...                           ["eng", "spa"])
+        >>> c["spa"]["/scriptures/bofm/hel/3.p29"]
+        29 Sí, vemos que todo aquel que quiera puede asirse a la palabra ...
+        """
+        paths = []
+        for u in uris:
+            # drop locale (always 3 letters) if there is one
+            parts = u.split('/')
+            if len(parts) > 2 and len(parts[1]) == 3:
+                u = "/" + "/".join(parts[2:])
+            paths.append(u)
+        paths = list(dict.fromkeys(paths))
+
+        wanted = [f"/{loc}{p}" for loc in locales for p in paths]
+        fetched = Content.fetch(wanted, json=json, cache=cache,
+                                session=session)
+
+        out = {loc: {} for loc in locales}
+        for u, c in zip(wanted, fetched):
+            out[locale_of(u)][u[len(locale_of(u)) + 1:]] = c
+        return out
@@ -0,0 +1,196 @@
+import re
+from array import array
+from collections import Counter, deque
+
+from ldsnotes.annotations import Reference
+
+
+def _uris_from_url(url):
+    """Turns a Highlight url back into a uri for each verse, ie
+    .../study/scriptures/bofm/hel/3.p29-p30?lang=eng into
+    /scriptures/bofm/hel/3.p29 and /scriptures/bofm/hel/3.p30"""
+    path = url.split("?")[0].split("/study", 1)[-1]
+    match = re.fullmatch(r"(.*\.p)(\d+)-p(\d+)", path)
+    if match is None:
+        return [path]
+    base, first, last = match.groups()
+    return [f"{base}{p}" for p in range(int(first), int(last) + 1)]
+
+
+def chapter(uri):
+    """Returns chapter/talk uri a verse/paragraph uri is in, ie
+    /scriptures/bofm/hel/3.p29 -> /scriptures/bofm/hel/3"""
+    return uri.split(".p")[0]
+
+
+class ReferenceGraph:
+    """Graph of links between verses/paragraphs made by Reference
+    annotations.
+
+    Each verse/paragraph uri is a node, numbered as it's first seen, and
+    links are kept as arrays of node numbers in both directions. Add
+    references as they're pulled (raw pages work, and don't need content
+    pulled), then query by uri, chapter uri or reference name
+    (ie "Helaman 3:29", only known if Reference objects were added).
+
+    Examples
+    ---------
+    >>> graph = ReferenceGraph()
+    >>> for page in n.pages(annot_type="reference"):
+    ...     graph.add(page)
+    >>> graph.links_from("/scriptures/bofm/hel/3.p29")
+    ['/scriptures/nt/heb/4.p12']
+    >>> graph.most_linked(3)
+    [('/scriptures/bofm/hel/3', 12), ...]
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self.uris = []
+        self._out = []
+        self._in = []
+        self._chapters = {}
+        self._labels = {}
+        self._seen = set()
+        self.edges = 0
+
+    def add(self, annotations):
+        """Adds the links of any references in annotations. Annotations
+        that were already added (by id) or aren't references are skipped.
+
+        Parameters
+        -----------
+        annotations : list
+            Reference objects or raw annotation dictionaries."""
+        if not isinstance(annotations, list):
+            annotations = [annotations]
+
+        for a in annotations:
+            if isinstance(a, dict):
+                if a['type'] != "reference" or a['id'] in self._seen:
+                    continue
+                src = [i['uri'] for i in a['highlight']['content']]
+                dst = [i['uri'] for i in a['refs']]
+            else:
+                if not isinstance(a, Reference) or a.id in self._seen:
+                    continue
+                # references pickled before uris were kept only have urls,
+                # and ref_url can be missing verses
+                src = list(getattr(a, "uris", None) or _uris_from_url(a.url))
+                dst = list(getattr(a, "ref_uris", None)
+                           or _uris_from_url(a.ref_url))
+                self._label(a.reference, src[0])
+                self._label(a.headline, chapter(src[0]))
+                self._label(a.ref_reference, dst[0])
+                self._label(a.ref_headline, chapter(dst[0]))
+            self._seen.add(a['id'] if isinstance(a, dict) else a.id)
+
+            for s in src:
+                s = self._node(s)
+                for d in dst:
+                    d = self._node(d)
+                    self._out[s].append(d)
+                    self._in[d].append(s)
+                    self.edges += 1
+
+    def links_from(self, where):
+        """Returns uris linked to from a verse/paragraph/chapter.
+
+        Parameters
+        -----------
+        where : string
+            Uri of verse/paragraph or chapter, or reference name."""
+        return self._neighbours(where, self._out)
+
+    def links_to(self, where):
+        """Returns uris that link to a verse/paragraph/chapter. See
+        links_from."""
+        return self._neighbours(where, self._in)
+
+    def most_linked(self, n=10, by_chapter=True):
+        """Returns the most linked (to or from) chapters or verses.
+
+        Parameters
+        -----------
+        n : int
+            How many to return. Defaults to 10.
+        by_chapter : bool
+            Count per chapter/talk instead of per verse/paragraph.
+            Defaults to True.
+
+        Returns
+        --------
+        List of (uri, number of links) tuples, most linked first."""
+        counts = Counter()
+        for i, uri in enumerate(self.uris):
+            key = chapter(uri) if by_chapter else uri
+            counts[key] += len(self._out[i]) + len(self._in[i])
+        return counts.most_common(n)
+
+    def neighbourhood(self, where, k=2, direction="both"):
+        """Finds everything within k links of a verse/paragraph/chapter.
+
+        Parameters
+        -----------
+        where : string
+            Uri of verse/paragraph or chapter, or reference name.
+        k : int
+            Max number of links away. Defaults to 2.
+        direction : string
+            Follow links "out", "in" or "both" ways. Defaults to "both".
+
+        Returns
+        --------
+        Dictionary of uri to number of links away (not including where)."""
+        if direction not in ("out", "in", "both"):
+            raise ValueError("direction must be out, in or both")
+        start = self._resolve(where)
+        dist = {i: 0 for i in start}
+        queue = deque(start)
+        while queue:
+            i = queue.popleft()
+            if dist[i] == k:
+                continue
+            nexts = []
+            if direction != "in":
+                nexts.append(self._out[i])
+            if direction != "out":
+                nexts.append(self._in[i])
+            for adjacent in nexts:
+                for j in adjacent:
+                    if j not in dist:
+                        dist[j] = dist[i] + 1
+                        queue.append(j)
+        return {self.uris[i]: d for i, d in dist.items() if d != 0}
+
+    def _neighbours(self, where, adjacency):
+        start = self._resolve(where)
+        found = {}
+        for i in start:
+            for j in adjacency[i]:
+                found[j] = None
+        return [self.uris[j] for j in found]
+
+    def _resolve(self, where):
+        # node numbers of a verse uri, chapter uri or reference name
+        where = self._labels.get(where, where)
+        if where in self._ids:
+            return [self._ids[where]]
+        return list(self._chapters.get(where, ()))
+
+    def _node(self, uri):
+        i = self._ids.get(uri)
+        if i is None:
+            i = self._ids[uri] = len(self.uris)
+            self.uris.append(uri)
+            self._out.append(array('I'))
+            self._in.append(array('I'))
+            self._chapters.setdefault(chapter(uri), array('I')).append(i)
+        return i
+
+    def _label(self, name, uri):
+        if name:
+            self._labels.setdefault(name, uri)
+
+    def __len__(self):
+        return len(self.uris)
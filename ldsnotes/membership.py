@@ -0,0 +1,115 @@
+class FolderIndex:
+    """Two way index of which notes are in which folders.
+
+    Start it from Notes.folders (each Folder already has the ids of its
+    notes in order.id), then keep it current by passing it annotations as
+    they're pulled. Lookups both ways are dictionary lookups.
+
+    Parameters
+    -----------
+    folders : list
+        List of Folder objects, ie from Notes.folders. Defaults to none.
+
+    Examples
+    ---------
+    >>> index = n.folder_index()
+    >>> index.folders_of(n[0].id)
+    [(Folder) Journal]
+    >>> index.notes_in("Journal")[:2]
+    ['0b6a3d1e-...', '5c1f9a2b-...']
+    """
+
+    def __init__(self, folders=()):
+        # folder id -> Folder
+        self._folders = {}
+        # folder name -> folder id
+        self._names = {}
+        # folder id -> note ids, dict used as an ordered set
+        self._notes = {}
+        # note id -> folder ids, dict used as an ordered set
+        self._members = {}
+        self.add_folders(folders)
+
+    def add_folders(self, folders):
+        """Adds or refreshes folders in the index, including their notes.
+
+        Parameters
+        -----------
+        folders : list
+            List of Folder objects."""
+        for f in folders:
+            old = self._folders.get(f.id)
+            if old is not None and self._names.get(old.name) == f.id:
+                del self._names[old.name]
+            self._folders[f.id] = f
+            self._names[f.name] = f.id
+            self._notes.setdefault(f.id, {})
+
+            if 'order' in f and 'id' in f.order:
+                for note_id in f.order.id:
+                    self._link(note_id, f.id)
+
+    def update(self, annotations):
+        """Updates what folders each annotation is in.
+
+        Parameters
+        -----------
+        annotations : list
+            Annotation objects or raw annotation dictionaries, ie a page
+            from Notes.pages."""
+        if not isinstance(annotations, list):
+            annotations = [annotations]
+
+        for a in annotations:
+            if isinstance(a, dict):
+                note_id = a['id']
+                new = [f['id'] for f in a['folders']]
+            else:
+                note_id = a.id
+                new = a.folders_id
+
+            old = self._members.get(note_id, {})
+            for folder_id in [f for f in old if f not in new]:
+                self._unlink(note_id, folder_id)
+            for folder_id in new:
+                self._link(note_id, folder_id)
+
+    def remove(self, note_id):
+        """Removes a (deleted) note from every folder it's in."""
+        for folder_id in list(self._members.get(note_id, {})):
+            self._unlink(note_id, folder_id)
+        self._members.pop(note_id, None)
+
+    def folders_of(self, note_id):
+        """Returns list of Folder objects that note_id is in. Folders
+        that aren't in the catalog (see add_folders) are skipped."""
+        return [self._folders[f] for f in self._members.get(note_id, {})
+                if f in self._folders]
+
+    def notes_in(self, folder):
+        """Returns list of note ids in folder, in the order they were added.
+
+        Parameters
+        -----------
+        folder : Folder/string
+            Folder object, or the name or id of one."""
+        return list(self._notes.get(self._folder_id(folder), {}))
+
+    def _folder_id(self, folder):
+        if not isinstance(folder, str):
+            return folder.id
+        return self._names.get(folder, folder)
+
+    def _link(self, note_id, folder_id):
+        self._notes.setdefault(folder_id, {})[note_id] = None
+        self._members.setdefault(note_id, {})[folder_id] = None
+
+    def _unlink(self, note_id, folder_id):
+        self._notes.get(folder_id, {}).pop(note_id, None)
+        self._members.get(note_id, {}).pop(folder_id, None)
+
+    def __contains__(self, note_id):
+        return len(self._members.get(note_id, {})) != 0
+
+    def __len__(self):
+        return sum(1 for m in self._members.values() if len(m) != 0)
@@ -1,8 +1,16 @@
+from time import sleep, perf_counter
+from sys import intern
 import requests
-from time import sleep
 from ldsnotes.annotations import make_annotation
+from ldsnotes.cache import CachedSession
+from ldsnotes.membership import FolderIndex
+from ldsnotes.paging import PageSizer
+from ldsnotes.watch import Watcher
+from ldsnotes import content, columnar, snapshot
+from ldsnotes.content import Content
 from addict import Dict
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # install chrome driver
 import chromedriver_autoinstaller
@@ -20,6 +28,15 @@ ANNOTATIONS = "https://www.churchofjesuschrist.org/notes/api/v2/annotations"
 FOLDERS = "https://www.churchofjesuschrist.org/notes/api/v2/folders"
 
 
+def _retryable(error):
+    # worth trying again smaller: timeouts, dropped connections and 5xx,
+    # but not being logged out or asking for something that isn't there
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    return isinstance(error, requests.HTTPError) and \
+        error.response is not None and error.response.status_code >= 500
+
+
 class Tag(Dict):
     """Object that holds all Tag info
 
@@ -37,6 +54,9 @@ class Tag(Dict):
     def __init__(self, *args, **kwargs):
         super().__init__(self, *args, **kwargs)
         self.lastUsed = datetime.fromisoformat(self.lastUsed)
+        # shared with the tags list of every annotation
+        self.name = intern(self.name)
+        self.id = intern(self.id)
 
     def __str__(self):
         return "(Tag) " + self.name
@@ -61,6 +81,12 @@ class Folder(Dict):
 
     def __init__(self, *args, **kwargs):
         super().__init__(self, *args, **kwargs)
+        # shared with the folders_id list of every annotation (addict also
+        # makes nested dicts like order into Folders, so check it's an id)
+        if isinstance(self.id, str):
+            self.id = intern(self.id)
+        if 'order' in self and 'id' in self.order:
+            self.order.id = [intern(i) for i in self.order.id]
 
     def __str__(self):
         return "(Folder) " + self.name
@@ -90,17 +116,49 @@ class Notes:
         and just input it
     headless : bool
         Whether to run selenium headless or not
+    cache : ResponseCache
+        Cache for tag/folder responses (and the newest annotation, which
+        Notes.watch polls). These are revalidated with the server each
+        time, so unchanged data costs a 304 instead of a full download.
+        Pages of annotations aren't cached. Defaults to a new in memory
+        cache.
+    content_cache : ResponseCache
+        Cache for verse/paragraph content. Defaults to
+        ldsnotes.content.CACHE, which is shared by all Notes objects.
+    content_session : requests.Session
+        Session to pull content with. Defaults to ldsnotes.content.SESSION,
+        which is shared by all Notes objects.
+    adapter : requests.adapters.HTTPAdapter
+        Adapter (connection pool) to send requests through. Pass the same
+        one to multiple Notes objects to share connections. Defaults to
+        None, which gives each Notes its own.
+    coalescer : ContentCoalescer
+        If given, content requests made at the same time (ie from multiple
+        threads, or multiple Notes sharing it) are combined. Defaults to
+        None.
 
     Attributes
     -----------
     tags : list
         List of Tag objects of all your tags
     folders : list
-        List of Folder objects of all your folders"""
+        List of Folder objects of all your folders
+    cache_stats : dict
+        Hit/miss/revalidation counts of both caches"""
 
     def __init__(self, username=None, password=None,
-                 token=None, headless=True):
-        self.session = requests.Session()
+                 token=None, headless=True, cache=None, content_cache=None,
+                 content_session=None, adapter=None, coalescer=None):
+        self.session = CachedSession(cache, cacheable=self._cacheable)
+        if adapter is not None:
+            self.session.mount("https://", adapter)
+        self.content_cache = content.CACHE if content_cache is None \
+            else content_cache
+        self.content_session = content.SESSION if content_session is None \
+            else content_session
+        self._fetch = Content.fetch if coalescer is None else coalescer.fetch
+        # cleaned verse text shared by all highlights pulled by this object
+        self._pool = {}
 
         if token is None:
             self.username = username
@@ -148,6 +206,11 @@ class Notes:
 
         return self.token
 
+    @property
+    def cache_stats(self):
+        return {"http": dict(self.session.cache.stats),
+                "content": dict(self.content_cache.stats)}
+
     @property
     def tags(self):
         return [Tag(t) for t in self.session.get(url=TAGS).json()]
@@ -156,6 +219,28 @@ class Notes:
     def folders(self):
         return [Folder(f) for f in self.session.get(url=FOLDERS).json()]
 
+    @staticmethod
+    def _cacheable(url, params):
+        # only revalidate small responses that are polled, not every page
+        if url in (TAGS, FOLDERS):
+            return True
+        return url == ANNOTATIONS and params is not None and \
+            params.get("start") == 1 and params.get("numberToReturn") == 1
+
+    def _make(self, json):
+        return make_annotation(json, cache=self.content_cache,
+                               session=self.content_session,
+                               pool=self._pool, fetch=self._fetch)
+
+    def folder_index(self):
+        """Makes an index to look up what folders a note is in, and what
+        notes are in a folder. Keep it current with FolderIndex.update.
+
+        Returns
+        --------
+        FolderIndex"""
+        return FolderIndex(self.folders)
+
     def __getitem__(self, val):
         if isinstance(val, slice):
             if val.start is None:
@@ -171,7 +256,7 @@ class Notes:
             num = 1
 
         params = {"start": start, "numberToReturn": num, "notesAsHtml": False}
-        return make_annotation(self.session.get(
+        return self._make(self.session.get(
             url=ANNOTATIONS, params=params).json())
 
     def search(self, keyword=None, tag=None, folder=None,
@@ -205,6 +290,325 @@ class Notes:
         --------
         List of strings or Bookmark/Highlight/Journal/Reference objects
         """
+        params = self._params(keyword, tag, folder, annot_type, as_html)
+        params['start'] = start
+        params['numberToReturn'] = stop - start
+
+        # send request
+        if json:
+            return self.session.get(url=ANNOTATIONS, params=params).json()
+        else:
+            return self._make(self.session.get(
+                url=ANNOTATIONS, params=params).json())
+
+    def multi_search(self, keywords=None, tags=None, folders=None,
+                     annot_type=["bookmark", "highlight",
+                                 "journal", "reference"],
+                     start=1, stop=51, all_tags=False, max_workers=8,
+                     as_html=False, json=False):
+        """Searches for annotations matching any of several keywords, tags
+        or folders at once.
+
+        Annotations have to match one of the keywords, one of the tags
+        (or all of them if all_tags) and be in one of the folders. Each
+        combination is searched concurrently, and the results are merged
+        (without duplicates) in order of most recently edited. Content for
+        all of them is then pulled at once.
+
+        Parameters
+        -----------
+        keywords : list/string
+            Keywords to search for. Defaults to None.
+        tags : list/string
+            Names of tags to search for. Defaults to None.
+        folders : list/string
+            Names of folders to search in. Defaults to None.
+        annot_type : list/string
+            Type of annotation to pull. See search. Defaults to all of them.
+        start : int
+            How deep in to start search (must be > 1). Defaults to 1.
+        stop : int
+            Where to stop search. Defaults to 51.
+        all_tags : bool
+            If True, annotations must have every one of tags instead of any
+            of them. Defaults to False.
+        max_workers : int
+            Max number of searches to run at once. Defaults to 8.
+        as_html : bool
+            See search. Defaults to False.
+        json : bool
+            See search. Defaults to False.
+
+        Returns
+        --------
+        List of strings or Bookmark/Highlight/Journal/Reference objects
+
+        Examples
+        ---------
+        >>> n.multi_search(tags=["Faith", "Hope"],
+        ...                folders=["Journal", "Study"])
+        """
+        def as_list(x):
+            if x is None:
+                return [None]
+            if isinstance(x, str):
+                return [x]
+            return list(x)
+
+        keywords = as_list(keywords)
+        tags = as_list(tags)
+        if folders is not None:
+            by_name = {f.name: f for f in self.folders}
+            missing = [f for f in as_list(folders) if f not in by_name]
+            if len(missing) != 0:
+                raise ValueError(f"You tried to search in a folder that "
+                                 f"doesn't exist: {', '.join(missing)}")
+            folders = [by_name[f] for f in as_list(folders)]
+        folders = as_list(folders)
+
+        if all_tags and tags != [None]:
+            # only search the rarest tag, and check for the rest ourselves
+            counts = {t.name: int(t.annotationCount) for t in self.tags}
+            required = set(tags)
+            tags = [min(tags, key=lambda t: counts.get(t, 0))]
+        else:
+            required = set()
+
+        def run(query):
+            keyword, tag, folder = query
+            if len(required) == 0:
+                return self.search(keyword, tag, folder, annot_type,
+                                   1, stop, as_html, json=True)
+            found = []
+            for page in self.pages(keyword, tag, folder, annot_type,
+                                   max(stop, 50), as_html):
+                found += [j for j in page if required <= set(j['tags'])]
+                if len(found) >= stop - 1:
+                    break
+            return found
+
+        queries = [(k, t, f) for k in keywords for t in tags for f in folders]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(run, queries))
+
+        # merge, keeping most recently edited first
+        merged = {}
+        for r in results:
+            for j in r:
+                merged[j['id']] = j
+        merged = sorted(merged.values(), reverse=True,
+                        key=lambda j: datetime.fromisoformat(j['lastUpdated']))
+        merged = merged[start - 1:stop - 1]
+
+        if json:
+            return merged
+        else:
+            return self._make(merged)
+
+    def update(self, annotations):
+        """Writes (partial) annotations back to lds.org in one request. Most
+        of the time you'll want SyncEngine instead, which figures out what
+        changed for you.
+
+        Parameters
+        -----------
+        annotations : list
+            Annotation dictionaries with at least an id, and only the
+            fields to change.
+
+        Returns
+        --------
+        List of the updated annotation dictionaries."""
+        resp = self.session.put(url=ANNOTATIONS, json=annotations)
+        resp.raise_for_status()
+        return resp.json()
+
+    def pages(self, keyword=None, tag=None, folder=None,
+              annot_type=["bookmark", "highlight", "journal", "reference"],
+              page_size=100, as_html=False, concurrency=1):
+        """Pulls every matching annotation, one page at a time. Takes the
+        same search parameters as search.
+
+        Parameters
+        -----------
+        page_size : int/string/PageSizer
+            Number of annotations to request at once. If "auto" (or a
+            PageSizer), the size is adjusted as pages come in to get through
+            them as fast as possible, and pages that time out, drop the
+            connection or get a 5xx are retried smaller. If the server
+            sends fewer than asked for, the rest are asked for next, so
+            paging only stops at an empty page. Defaults to 100.
+        concurrency : int
+            Number of pages to request at once. Pages are still yielded in
+            order. Defaults to 1.
+
+        Yields
+        --------
+        List of raw annotation dictionaries from lds.org for each page."""
+        params = self._params(keyword, tag, folder, annot_type, as_html)
+        if page_size == "auto":
+            sizer = PageSizer()
+        elif isinstance(page_size, PageSizer):
+            sizer = page_size
+        else:
+            sizer = None
+        timeout = None if sizer is None else sizer.timeout
+
+        def fetch(start, size):
+            p = dict(params, start=start, numberToReturn=size)
+            resp = self.session.get(url=ANNOTATIONS, params=p,
+                                    timeout=timeout)
+            resp.raise_for_status()
+            return resp.json(), len(resp.content)
+
+        start = 1
+        # length of the last short page, which is either the end or the
+        # most the server will send at once
+        short = None
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                size = page_size if sizer is None else sizer.size
+                starts = [start + i * size for i in range(concurrency)]
+                began = perf_counter()
+                try:
+                    window = list(pool.map(fetch, starts,
+                                           [size] * concurrency))
+                except requests.RequestException as e:
+                    if sizer is None or not _retryable(e) or \
+                            not sizer.failed():
+                        raise
+                    continue
+
+                if len(window[0][0]) == 0:
+                    return
+                if short is not None:
+                    # more came after a short page, so the server caps it
+                    if sizer is None:
+                        page_size = short
+                    else:
+                        sizer.max_size = short
+                        sizer.size = min(sizer.size, short)
+                    short = None
+
+                for offset, (page, _) in zip(starts, window):
+                    if len(page) == 0:
+                        return
+                    yield page
+                    start = offset + len(page)
+                    if len(page) < size:
+                        # later pages in the window would skip some
+                        short = len(page)
+                        break
+
+                if sizer is not None:
+                    # time includes whatever was done with the pages
+                    sizer.record(size, sum(len(p) for p, _ in window)
+                                 / concurrency, perf_counter() - began,
+                                 max(n for _, n in window))
+
+    def record_batches(self, keyword=None, tag=None, folder=None,
+                       annot_type=["bookmark", "highlight",
+                                   "journal", "reference"],
+                       page_size=100):
+        """Pulls every matching annotation as pyarrow.RecordBatch's, one per
+        page, without making an object for each annotation. Takes the same
+        parameters as pages. Requires pyarrow.
+
+        Yields
+        --------
+        pyarrow.RecordBatch with the columns in ldsnotes.columnar.COLUMNS"""
+        for page in self.pages(keyword, tag, folder, annot_type, page_size):
+            yield columnar.record_batch(columnar.columns(
+                page, cache=self.content_cache, session=self.content_session))
+
+    def to_dataframe(self, keyword=None, tag=None, folder=None,
+                     annot_type=["bookmark", "highlight",
+                                 "journal", "reference"],
+                     page_size=100):
+        """Pulls every matching annotation into a pandas DataFrame. Takes
+        the same parameters as pages. Requires pyarrow and pandas.
+
+        Returns
+        --------
+        DataFrame with categorical type, locale, color and publication
+        columns, and datetime64 last_update."""
+        return columnar.to_dataframe(self.record_batches(
+            keyword, tag, folder, annot_type, page_size))
+
+    def save_snapshot(self, path,
+                      annot_type=["bookmark", "highlight",
+                                  "journal", "reference"],
+                      page_size="auto"):
+        """Pulls every annotation, plus your tags and folders, and saves them
+        fully parsed to a binary snapshot. Loading it back with
+        Notes.load_snapshot is much faster than pulling everything again.
+
+        Parameters
+        -----------
+        path : string
+            File to save to.
+        annot_type : list/string
+            Type of annotations to save. Defaults to all of them.
+        page_size : int/string
+            See pages. Defaults to "auto"."""
+        annotations = []
+        for page in self.pages(annot_type=annot_type, page_size=page_size):
+            parsed = self._make(page)
+            annotations += parsed if isinstance(parsed, list) else [parsed]
+        snapshot.save(path, annotations, self.tags, self.folders)
+
+    @staticmethod
+    def load_snapshot(path, types=None, ids=None, catalog=True):
+        """Loads a snapshot saved with save_snapshot. Doesn't need to be
+        logged in. See ldsnotes.snapshot.load for parameters. Snapshots are
+        pickled, so only load ones you saved yourself.
+
+        Returns
+        --------
+        Snapshot with annotations, tags, folders and when it was created.
+        """
+        return snapshot.load(path, types, ids, catalog)
+
+    def watch(self, interval=300, jitter=0.1, backoff=2.0, max_interval=3600,
+              annot_type=["bookmark", "highlight", "journal", "reference"],
+              parse=True, **kwargs):
+        """Watches for annotations being created, edited or deleted, forever.
+        Polls are cheap (only the newest annotation and tag/folder counts are
+        checked) and get further apart while nothing changes. The first poll,
+        and any where a tag/folder count goes down, page through every
+        annotation (without content). See Watcher for the rest of the
+        parameters.
+
+        Parameters
+        -----------
+        interval : float
+            Seconds between polls. Defaults to 300.
+        jitter : float
+            Randomly change each wait by up to this fraction. Defaults to
+            0.1.
+        backoff : float
+            While nothing changes, multiply the wait by this each poll, up to
+            max_interval. Defaults to 2.
+        max_interval : float
+            Longest to wait between polls. Defaults to 3600.
+        annot_type : list/string
+            Type of annotations to watch. Defaults to all of them.
+        parse : bool
+            If False, events hold raw dictionaries. Defaults to True.
+
+        Yields
+        --------
+        Event for each change, oldest first.
+
+        Examples
+        ---------
+        >>> for event in n.watch(interval=60):
+        ...     print(event.kind, event.id)
+        """
+        return iter(Watcher(self, interval, jitter, backoff, max_interval,
+                            annot_type, parse, **kwargs))
+
+    def _params(self, keyword, tag, folder, annot_type, as_html):
         # clean out requested annotation type
         if isinstance(annot_type, str):
             annot_type = [annot_type]
@@ -215,22 +619,16 @@ class Notes:
             raise ValueError("You tried to search for type that doesn't exist")
 
         # setup request
-        params = {
-            "start": start,
-            "numberToReturn": stop - start,
-            "notesAsHtml": as_html}
+        params = {"notesAsHtml": as_html}
         params['type'] = ",".join(annot_type)
         if tag is not None:
             params['tags'] = tag
-        if folder is not None:
+        if isinstance(folder, str):
             folderid = [f.id for f in self.folders if f.name == folder][0]
             params['folderId'] = folderid
+        elif folder is not None:
+            params['folderId'] = folder.id
         if keyword is not None:
             params['searchPhrase'] = keyword
 
-        # send request
-        if json:
-            return self.session.get(url=ANNOTATIONS, params=params).json()
-        else:
-            return make_annotation(self.session.get(
-                url=ANNOTATIONS, params=params).json())
+        return params
@@ -0,0 +1,95 @@
+class PageSizer:
+    """Picks how many annotations to request per page (numberToReturn).
+
+    Small pages waste round trips, and big ones make the content fetch that
+    follows slow. The sizer times each page (including whatever's done with
+    it before the next one is asked for) and hill climbs towards the size
+    that gets the most notes/second, staying between min_size and max_size.
+    When a page fails or times out, the size is halved and the page retried.
+
+    Parameters
+    -----------
+    initial : int
+        Size of the first page. Defaults to 50.
+    min_size : int
+        Smallest page to ask for. Defaults to 10.
+    max_size : int
+        Largest page to ask for. Defaults to 500.
+    max_bytes : int
+        Pages bigger than this (in bytes) are shrunk no matter how fast
+        they were. Defaults to 2 MB.
+    timeout : float
+        Seconds to wait for a page before treating it as failed.
+        Defaults to 30.
+    retries : int
+        Number of failures in a row at min_size before giving up.
+        Defaults to 3.
+    factor : float
+        How much to grow/shrink the size by each page. Defaults to 1.5.
+
+    Attributes
+    -----------
+    size : int
+        Size to use for the next page.
+    history : list
+        (size, notes/second) of every page recorded."""
+
+    def __init__(self, initial=50, min_size=10, max_size=500,
+                 max_bytes=2 * 2**20, timeout=30, retries=3, factor=1.5):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.retries = retries
+        self.factor = factor
+        self.size = self._clamp(initial)
+        self.history = []
+        self._direction = 1
+        self._last_rate = None
+        self._failures = 0
+
+    def _clamp(self, size):
+        return int(max(self.min_size, min(self.max_size, size)))
+
+    def record(self, size, notes, seconds, nbytes=0):
+        """Records how a page went and picks the next size.
+
+        Parameters
+        -----------
+        size : int
+            numberToReturn the page was asked for with.
+        notes : int
+            Number of annotations that came back.
+        seconds : float
+            How long it took, including anything done with it.
+        nbytes : int
+            Size of the response in bytes. Defaults to 0."""
+        self._failures = 0
+        rate = notes / max(seconds, 1e-9)
+        self.history.append((size, rate))
+
+        if nbytes > self.max_bytes:
+            self._direction = -1
+        elif self._last_rate is not None and rate < self._last_rate:
+            # got slower, so go back the other way
+            self._direction = -self._direction
+        self._last_rate = rate
+
+        if self._direction > 0:
+            self.size = self._clamp(size * self.factor)
+        else:
+            self.size = self._clamp(size / self.factor)
+
+    def failed(self):
+        """Records a failed/timed out page and halves the size.
+
+        Returns
+        --------
+        True if the page should be retried, False if it's failed too many
+        times at min_size already."""
+        if self.size == self.min_size:
+            self._failures += 1
+        self.size = self._clamp(self.size // 2)
+        self._direction = -1
+        self._last_rate = None
+        return self._failures < self.retries
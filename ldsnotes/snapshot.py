@@ -0,0 +1,201 @@
+"""Versioned binary snapshots of parsed annotations.
+
+A snapshot file is::
+
+    b"LDSNOTES" | header length (4 bytes) | header (json) | blocks...
+
+The header holds the format and library version it was written with, and
+an index of blocks. Each block is a pickled list of up to block_size
+annotations of one type, sorted by id, so loading only some types or an id
+range only reads the blocks it needs. Tags and folders are their own block.
+
+Blocks are pickled, so loading a snapshot can run any code its author put
+in it. Only load snapshots you saved yourself.
+"""
+import json
+import pickle
+import struct
+from collections import namedtuple
+from datetime import datetime
+from sys import intern
+
+import ldsnotes
+from ldsnotes.annotations import _share
+
+MAGIC = b"LDSNOTES"
+FORMAT_VERSION = 3
+
+# strings interned/shared when parsing (see annotations), which pickle only
+# keeps shared within a block
+INTERNED = ("color", "publication", "ref_publication")
+SHARED = ("content", "hl", "url", "headline", "reference", "ref_content",
+          "ref_url", "ref_headline", "ref_reference")
+
+Snapshot = namedtuple("Snapshot", ["annotations", "tags", "folders",
+                                   "created"])
+Snapshot.__doc__ = """Contents of a snapshot file.
+
+Attributes
+-----------
+annotations : list
+    Bookmark/Journal/Highlight/Reference objects that were loaded.
+tags : list
+    Tag objects (empty if not loaded).
+folders : list
+    Folder objects (empty if not loaded).
+created : datetime
+    When the snapshot was saved."""
+
+
+class StaleSnapshotError(ValueError):
+    """Raised when a snapshot was written by a different version of
+    ldsnotes (or of the file format), and has to be pulled again."""
+
+
+def save(path, annotations, tags=(), folders=(), block_size=2000):
+    """Saves annotations and tag/folder catalog to a snapshot file.
+
+    Parameters
+    -----------
+    path : string
+        File to write to.
+    annotations : list
+        Bookmark/Journal/Highlight/Reference objects.
+    tags : list
+        Tag objects. Defaults to none.
+    folders : list
+        Folder objects. Defaults to none.
+    block_size : int
+        Max number of annotations pickled together. Smaller blocks make
+        loading an id range read less. Defaults to 2000."""
+    by_type = {}
+    for a in annotations:
+        by_type.setdefault(type(a).__name__.lower(), []).append(a)
+
+    blocks = [("catalog", None, None, pickle.dumps(
+        (list(tags), list(folders)), protocol=pickle.HIGHEST_PROTOCOL))]
+    for kind, group in sorted(by_type.items()):
+        group.sort(key=lambda a: a.id)
+        for i in range(0, len(group), block_size):
+            chunk = group[i:i + block_size]
+            blocks.append((kind, chunk[0].id, chunk[-1].id, pickle.dumps(
+                chunk, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    index = []
+    offset = 0
+    for kind, first, last, data in blocks:
+        index.append({"type": kind, "first": first, "last": last,
+                      "offset": offset, "length": len(data)})
+        offset += len(data)
+    header = json.dumps({"format": FORMAT_VERSION,
+                         "version": ldsnotes.__version__,
+                         "created": datetime.now().isoformat(),
+                         "blocks": index}).encode()
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for block in blocks:
+            f.write(block[3])
+
+
+def _header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not an ldsnotes snapshot")
+    length, = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(length))
+    if header["format"] != FORMAT_VERSION or \
+            header["version"] != ldsnotes.__version__:
+        raise StaleSnapshotError(
+            f"Snapshot was saved by ldsnotes {header['version']} (format "
+            f"{header['format']}), this is {ldsnotes.__version__} (format "
+            f"{FORMAT_VERSION}). Pull your notes again.")
+    return header, len(MAGIC) + 4 + length
+
+
+def _reshare(annotations, pool):
+    for a in annotations:
+        a.tags = [intern(t) for t in a.tags]
+        a.folders_id = [intern(i) for i in a.folders_id]
+        for name in INTERNED:
+            value = getattr(a, name, None)
+            if value is not None:
+                setattr(a, name, intern(value))
+        for name in SHARED:
+            value = getattr(a, name, None)
+            if value is not None:
+                setattr(a, name, _share(value, pool))
+        for name in ("uris", "ref_uris"):
+            value = getattr(a, name, None)
+            if value is not None:
+                setattr(a, name, tuple(_share(u, pool) for u in value))
+
+
+def _reshare_catalog(tags, folders):
+    for t in tags:
+        t.name = intern(t.name)
+        t.id = intern(t.id)
+    for f in folders:
+        f.id = intern(f.id)
+        if 'order' in f and 'id' in f.order:
+            f.order.id = [intern(i) for i in f.order.id]
+
+
+def load(path, types=None, ids=None, catalog=True):
+    """Loads a snapshot saved with save. Blocks are unpickled, so only load
+    snapshots you saved yourself: a crafted file can run any code.
+
+    Parameters
+    -----------
+    path : string
+        File to read.
+    types : list/string
+        Only load these types (bookmark, highlight, journal, reference).
+        Defaults to all of them.
+    ids : tuple
+        Only load annotations with first <= id <= last, given as
+        (first, last). Defaults to all of them.
+    catalog : bool
+        Whether to load tags and folders. Defaults to True.
+
+    Returns
+    --------
+    Snapshot, with annotations most recently edited first.
+
+    Raises
+    -------
+    StaleSnapshotError
+        If the snapshot was saved by another version of ldsnotes."""
+    if isinstance(types, str):
+        types = [types]
+
+    annotations = []
+    tags = folders = []
+    with open(path, "rb") as f:
+        header, start = _header(f)
+        for block in header["blocks"]:
+            if block["type"] == "catalog":
+                if not catalog:
+                    continue
+            elif types is not None and block["type"] not in types:
+                continue
+            elif ids is not None and (block["last"] < ids[0]
+                                      or block["first"] > ids[1]):
+                continue
+
+            f.seek(start + block["offset"])
+            data = pickle.loads(f.read(block["length"]))
+            if block["type"] == "catalog":
+                tags, folders = data
+            elif ids is not None:
+                annotations += [a for a in data if ids[0] <= a.id <= ids[1]]
+            else:
+                annotations += data
+
+    # share strings across blocks again, like when they were parsed
+    _reshare(annotations, {})
+    _reshare_catalog(tags, folders)
+    annotations.sort(key=lambda a: a.last_update, reverse=True)
+    return Snapshot(annotations, tags, folders,
+                    datetime.fromisoformat(header["created"]))
@@ -0,0 +1,246 @@
+import json as jsonlib
+from collections import namedtuple
+from datetime import datetime
+
+# fields that can be edited locally and pushed back up
+FIELDS = ("tags", "folders_id", "title", "note")
+
+Change = namedtuple("Change", ["id", "fields", "base_update"])
+Change.__doc__ = """Local edits to one annotation.
+
+Attributes
+-----------
+id : string
+    Id of annotation.
+fields : dict
+    Only the fields that changed (see ldsnotes.sync.FIELDS) and their new
+    values.
+base_update : string
+    lastUpdated of the server copy the edits were made from."""
+
+Conflict = namedtuple("Conflict", ["id", "local", "server"])
+Conflict.__doc__ = """An annotation edited both locally and on the server.
+
+Attributes
+-----------
+id : string
+    Id of annotation.
+local : dict
+    Fields changed locally.
+server : dict
+    Raw json of the newer server copy."""
+
+SyncResult = namedtuple("SyncResult", ["pushed", "conflicts", "requests"])
+SyncResult.__doc__ = """Outcome of SyncEngine.push.
+
+Attributes
+-----------
+pushed : list
+    Ids of annotations written to the server.
+conflicts : list
+    List of Conflict that weren't pushed.
+requests : int
+    Number of write requests sent."""
+
+
+def fields_of(annotation):
+    """Pulls editable fields out of an annotation object or raw json."""
+    if isinstance(annotation, dict):
+        note = annotation.get('note', {})
+        return {"tags": list(annotation['tags']),
+                "folders_id": [f['id'] for f in annotation['folders']],
+                "title": note.get('title', ""),
+                "note": note.get('content', "")}
+    else:
+        return {"tags": list(annotation.tags),
+                "folders_id": list(annotation.folders_id),
+                "title": getattr(annotation, 'title', ""),
+                "note": getattr(annotation, 'note', "")}
+
+
+def _last_update(annotation):
+    if isinstance(annotation, dict):
+        return annotation['lastUpdated']
+    return annotation.last_update.isoformat()
+
+
+def to_json(change):
+    """Turns a Change into the partial annotation lds.org expects."""
+    out = {"id": change.id, "lastUpdated": change.base_update}
+    fields = change.fields
+    if "tags" in fields:
+        out["tags"] = fields["tags"]
+    if "folders_id" in fields:
+        out["folders"] = [{"id": f} for f in fields["folders_id"]]
+    if "title" in fields or "note" in fields:
+        out["note"] = {}
+        if "title" in fields:
+            out["note"]["title"] = fields["title"]
+        if "note" in fields:
+            out["note"]["content"] = fields["note"]
+    return out
+
+
+class SyncEngine:
+    """Pushes local edits of tags, folders and notes back to lds.org.
+
+    The engine remembers the last server copy of every annotation it's
+    seen (its id, lastUpdated and editable fields). When pushing, only
+    annotations whose fields differ from that copy are sent, with only the
+    fields that changed, batch_size at a time.
+
+    Before writing, the most recently edited annotations on the server are
+    checked. If one of the locally edited annotations was also edited on
+    the server since it was pulled, it's reported as a Conflict and not
+    pushed.
+
+    Parameters
+    -----------
+    notes : Notes
+        Notes object to pull/push with.
+    state : dict
+        Last known server state, ie from a previous SyncEngine.state or
+        SyncEngine.load. Defaults to empty.
+    batch_size : int
+        Max number of annotations per write request. Defaults to 50.
+    index : FolderIndex
+        Folder index to keep current with pushed folder changes.
+        Defaults to None.
+
+    Examples
+    ---------
+    >>> sync = SyncEngine(n)
+    >>> notes = n.search(tag="Faith")
+    >>> sync.track(notes)
+    >>> notes[0].tags.append("Hope")
+    >>> sync.push(notes)
+    SyncResult(pushed=['...'], conflicts=[], requests=1)
+    """
+
+    def __init__(self, notes, state=None, batch_size=50, index=None):
+        self.notes = notes
+        self.state = {} if state is None else state
+        self.batch_size = batch_size
+        self.index = index
+
+    def track(self, annotations):
+        """Records annotations as the last known server state. Call this
+        with whatever was pulled before editing it.
+
+        Parameters
+        -----------
+        annotations : list
+            Annotation objects or raw annotation dictionaries."""
+        if not isinstance(annotations, list):
+            annotations = [annotations]
+        for a in annotations:
+            a_id = a['id'] if isinstance(a, dict) else a.id
+            self.state[a_id] = {"last_update": _last_update(a),
+                                "fields": fields_of(a)}
+
+    def changes(self, annotations):
+        """Compares annotations against the last known server state.
+
+        Parameters
+        -----------
+        annotations : list
+            Locally edited annotation objects (or raw dictionaries).
+            Annotations that were never tracked are skipped.
+
+        Returns
+        --------
+        List of Change with only the fields that differ."""
+        if not isinstance(annotations, list):
+            annotations = [annotations]
+
+        out = []
+        for a in annotations:
+            a_id = a['id'] if isinstance(a, dict) else a.id
+            base = self.state.get(a_id)
+            if base is None:
+                continue
+            local = fields_of(a)
+            changed = {k: local[k] for k in FIELDS
+                       if local[k] != base["fields"][k]}
+            if len(changed) != 0:
+                out.append(Change(a_id, changed, base["last_update"]))
+        return out
+
+    def push(self, annotations, page_size=50):
+        """Sends local edits to lds.org.
+
+        Parameters
+        -----------
+        annotations : list
+            Locally edited annotation objects (or raw dictionaries).
+        page_size : int
+            Page size used when checking the server for newer edits.
+            Defaults to 50.
+
+        Returns
+        --------
+        SyncResult"""
+        changes = self.changes(annotations)
+        if len(changes) == 0:
+            return SyncResult([], [], 0)
+
+        # look for anything edited on the server since we pulled it
+        server = self._newer_than(
+            min(datetime.fromisoformat(c.base_update) for c in changes),
+            page_size)
+
+        conflicts = []
+        ready = []
+        for c in changes:
+            s = server.get(c.id)
+            if s is not None and datetime.fromisoformat(s['lastUpdated']) \
+                    > datetime.fromisoformat(c.base_update):
+                conflicts.append(Conflict(c.id, c.fields, s))
+            else:
+                ready.append(c)
+
+        pushed = []
+        requests = 0
+        for i in range(0, len(ready), self.batch_size):
+            batch = ready[i:i + self.batch_size]
+            resp = self.notes.update([to_json(c) for c in batch])
+            requests += 1
+            updated = {j['id']: j for j in resp
+                       if isinstance(j, dict) and 'id' in j}
+
+            for c in batch:
+                base = self.state[c.id]
+                base["fields"].update(
+                    {k: list(v) if isinstance(v, list) else v
+                     for k, v in c.fields.items()})
+                if c.id in updated and 'lastUpdated' in updated[c.id]:
+                    base["last_update"] = updated[c.id]['lastUpdated']
+                pushed.append(c.id)
+
+                if self.index is not None and "folders_id" in c.fields:
+                    self.index.update({"id": c.id, "folders": [
+                        {"id": f} for f in c.fields["folders_id"]]})
+
+        return SyncResult(pushed, conflicts, requests)
+
+    def _newer_than(self, since, page_size):
+        # annotations come most recent first, so stop once we're past since
+        server = {}
+        for page in self.notes.pages(page_size=page_size):
+            for j in page:
+                if datetime.fromisoformat(j['lastUpdated']) <= since:
+                    return server
+                server[j['id']] = j
+        return server
+
+    def save(self, path):
+        """Saves last known server state to a json file."""
+        with open(path, "w") as f:
+            jsonlib.dump(self.state, f)
+
+    @classmethod
+    def load(cls, notes, path, **kwargs):
+        """Makes a SyncEngine from a state saved with save. Takes the same
+        other parameters as SyncEngine."""
+        with open(path) as f:
+            return cls(notes, state=jsonlib.load(f), **kwargs)
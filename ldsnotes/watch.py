@@ -0,0 +1,207 @@
+import random
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import requests
+
+TYPES = ["bookmark", "highlight", "journal", "reference"]
+
+Event = namedtuple("Event", ["kind", "id", "annotation", "last_update"])
+Event.__doc__ = """A change to one annotation, from Notes.watch.
+
+Attributes
+-----------
+kind : string
+    One of "created", "updated" or "deleted".
+id : string
+    Id of annotation.
+annotation : object
+    Bookmark/Journal/Highlight/Reference object (or raw dictionary if not
+    parsing). None if deleted.
+last_update : datetime
+    When the annotation was last edited. None if deleted."""
+
+
+class Watcher:
+    """Polls lds.org for changes to your annotations. See Notes.watch.
+
+    Each poll only asks for the most recently edited annotation and your
+    tags and folders (all of which are revalidated through the cache, so
+    they cost a 304 when nothing changed). Only when those change are the
+    new annotations pulled and parsed. If tag/folder counts go down (or
+    every rescan_every polls, if set), every annotation is paged through
+    once (without content) to find deleted ones.
+
+    Parameters
+    -----------
+    notes : Notes
+        Notes object to poll with.
+    interval : float
+        Seconds between polls. Defaults to 300.
+    jitter : float
+        Randomly change each wait by up to this fraction, so many watchers
+        don't all poll at once. Defaults to 0.1.
+    backoff : float
+        While nothing changes (or polls fail), multiply the wait by this
+        each poll, up to max_interval. Defaults to 2.
+    max_interval : float
+        Longest to wait between polls. Defaults to 3600.
+    annot_type : list/string
+        Types of annotations to watch. Defaults to all of them.
+    parse : bool
+        Whether to parse annotations into objects (pulling their content),
+        or leave them as raw dictionaries. Defaults to True.
+    rescan_every : int
+        Also page through every annotation every this many polls, to catch
+        deleted annotations that had no tags or folders (which doesn't
+        change any counts). This costs a request per 100 annotations each
+        time.
+        Defaults to None, which only does it when counts go down.
+    known : dict
+        Annotation id to lastUpdated from a previous run (see
+        Watcher.known), to skip pulling every id on the first poll.
+        Defaults to None.
+    sleep : function
+        Function to wait with. Defaults to time.sleep.
+
+    Attributes
+    -----------
+    known : dict
+        Annotation id to lastUpdated of everything seen so far.
+    polls : int
+        Number of polls done."""
+
+    def __init__(self, notes, interval=300, jitter=0.1, backoff=2.0,
+                 max_interval=3600, annot_type=TYPES, parse=True,
+                 rescan_every=None, known=None, sleep=time.sleep):
+        self.notes = notes
+        self.interval = interval
+        self.jitter = jitter
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.annot_type = annot_type
+        self.parse = parse
+        self.rescan_every = rescan_every
+        self.known = known
+        self.sleep = sleep
+        self.polls = 0
+        self._signature = None
+        self._wait = interval
+
+    def __iter__(self):
+        while True:
+            bootstrap = self.known is None
+            try:
+                events = self.poll()
+            except requests.RequestException:
+                events = None
+
+            if events:
+                self._wait = self.interval
+                yield from events
+            elif bootstrap and events is not None:
+                # just pulled every id, nothing to slow down for yet
+                self._wait = self.interval
+            else:
+                # nothing changed (or lds.org had issues), so slow down
+                self._wait = min(self._wait * self.backoff, self.max_interval)
+            self.sleep(self._wait *
+                       (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def poll(self):
+        """Checks for changes once, without waiting.
+
+        Returns
+        --------
+        List of Event, oldest change first. If lds.org fails part way
+        through, nothing is marked as seen, so the next poll tries again."""
+        self.polls += 1
+        signature = self._poll_signature()
+        if self.known is None:
+            known = {j['id']: j['lastUpdated']
+                     for page in self._pages() for j in page}
+            self.known, self._signature = known, signature
+            return []
+
+        rescan = self.rescan_every is not None and \
+            self.polls % self.rescan_every == 0
+        if self._signature is not None:
+            rescan |= sum(signature[1].values()) < \
+                sum(self._signature[1].values())
+            rescan |= sum(signature[2].values()) < \
+                sum(self._signature[2].values())
+
+        if rescan:
+            changed, deleted = self._sweep()
+        elif signature != self._signature:
+            changed, deleted = self._newer(), []
+        else:
+            changed, deleted = [], []
+
+        # only remember what was seen once every event is built
+        events, known = self._events(changed, deleted)
+        self.known, self._signature = known, signature
+        return events
+
+    def _poll_signature(self):
+        head = self.notes.search(annot_type=self.annot_type, start=1,
+                                 stop=2, json=True)
+        head = tuple((j['id'], j['lastUpdated']) for j in head)
+        tags = {t.name: int(t.annotationCount) for t in self.notes.tags}
+        folders = {f.id: int(f.annotationCount or 0)
+                   for f in self.notes.folders}
+        return head, tags, folders
+
+    def _pages(self):
+        return self.notes.pages(annot_type=self.annot_type, page_size=100)
+
+    def _sweep(self):
+        # one pass over everything, keeping only json of what changed
+        seen = set()
+        changed = []
+        for page in self._pages():
+            for j in page:
+                seen.add(j['id'])
+                if self.known.get(j['id']) != j['lastUpdated']:
+                    changed.append(j)
+        return changed, [i for i in self.known if i not in seen]
+
+    def _newer(self):
+        # annotations come newest first, so stop at the first one we know
+        newest = max((datetime.fromisoformat(t)
+                      for t in self.known.values()), default=None)
+        changed = []
+        for page in self._pages():
+            for j in page:
+                if newest is not None and \
+                        datetime.fromisoformat(j['lastUpdated']) <= newest:
+                    return changed
+                changed.append(j)
+        return changed
+
+    def _events(self, changed, deleted):
+        # works on a copy of known, returned with the events
+        known = dict(self.known)
+        events = [Event("deleted", i, None, None) for i in deleted]
+        for i in deleted:
+            del known[i]
+
+        changed = [j for j in changed
+                   if known.get(j['id']) != j['lastUpdated']]
+        if len(changed) == 0:
+            return events, known
+
+        parsed = changed
+        if self.parse:
+            parsed = self.notes._make(changed)
+            if not isinstance(parsed, list):
+                parsed = [parsed]
+
+        # oldest first
+        for j, a in reversed(list(zip(changed, parsed))):
+            kind = "updated" if j['id'] in known else "created"
+            known[j['id']] = j['lastUpdated']
+            events.append(Event(kind, j['id'], a,
+                                datetime.fromisoformat(j['lastUpdated'])))
+        return events, known
@@ -31,8 +31,14 @@ setup(
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
     ],
+    entry_points={
+        'console_scripts': [
+            'ldsnotes=ldsnotes.cli:main',
+        ],
+    },
     description="Unofficial Python API to read your annotations from lds.org",
     install_requires=install_requires,
+    extras_require={'arrow': ['pyarrow', 'pandas']},
     license="MIT license",
     long_description=readme + '\n\n' + history,
     long_description_content_type='text/x-rst',
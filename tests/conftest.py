@@ -0,0 +1,24 @@
+"""Shared fixtures for tests against the local notes API stub."""
+
+import pytest
+import ldsnotes.note
+from tests.stub import NotesAPI
+
+
+@pytest.fixture
+def notes_api(monkeypatch):
+    """Returns a function that starts a NotesAPI with the given
+    annotations, folders and tokens, and points ldsnotes.note at it. Every
+    stub started is closed after the test."""
+    started = []
+
+    def start(annotations, folders=(), tokens=None):
+        api = NotesAPI(annotations, folders, tokens)
+        started.append(api)
+        for name, url in api.endpoints().items():
+            monkeypatch.setattr(ldsnotes.note, name, url)
+        return api
+
+    yield start
+    for api in started:
+        api.close()
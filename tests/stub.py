@@ -0,0 +1,205 @@
+"""Local stand in for lds.org's notes API, for tests that don't need a real
+account."""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def journal(i, tags=(), folders=(), when=None):
+    """Makes a raw journal annotation like the ANNOTATIONS endpoint."""
+    if when is None:
+        when = datetime(2021, 3, 1) - timedelta(hours=i)
+    return {"id": f"note-{i}", "type": "journal", "locale": "eng",
+            "tags": list(tags), "folders": [{"id": f} for f in folders],
+            "lastUpdated": when.isoformat(),
+            "note": {"title": f"Note {i}", "content": "Some thoughts."}}
+
+
+def highlight(i, uris, color="yellow", tags=(), folders=(), when=None):
+    """Makes a raw highlight annotation of the verse(s) at uri(s)."""
+    a = journal(i, tags, folders, when)
+    a['type'] = "highlight"
+    a['highlight'] = {"content": [
+        {"uri": u, "color": color, "startOffset": -1, "endOffset": -1}
+        for u in ([uris] if isinstance(uris, str) else uris)]}
+    return a
+
+
+def reference(i, src, dst, when=None):
+    """Makes a raw reference annotation linking uri(s) src to uri(s) dst."""
+    a = highlight(i, src, when=when)
+    a['type'] = "reference"
+    a['refs'] = [{"uri": u} for u in ([dst] if isinstance(dst, str) else dst)]
+    return a
+
+
+def folder(id, name, annotations):
+    """Makes a raw folder like the FOLDERS endpoint, holding every
+    annotation that lists it."""
+    ids = [a['id'] for a in annotations if id in [f['id'] for f in
+                                                  a['folders']]]
+    return {"id": id, "name": name, "annotationCount": len(ids),
+            "lastUsed": "2021-01-01T00:00:00", "order": {"id": ids}}
+
+
+def content(uri):
+    """Makes a content dictionary like the content endpoint for uri."""
+    return {"uri": uri, "content": [{"markup": "<p>Some verse.</p>"}],
+            "headline": uri.split(".p")[0].upper(),
+            "referenceURIDisplayText": uri.upper(),
+            "publication": "Book of Mormon"}
+
+
+class NotesAPI:
+    """Serves tags, folders and annotations from memory, most recently
+    edited first, and applies partial updates sent with PUT. Responses
+    have an ETag, and a matching If-None-Match gets a 304. If tokens are
+    given, requests without one of them get a 401."""
+
+    def __init__(self, annotations, folders=(), tokens=None):
+        self.annotations = list(annotations)
+        self.folders = list(folders)
+        self.tokens = tokens
+        # most annotations sent per request, like a server side cap
+        self.max_page = None
+        self.requests = []
+        self.clock = datetime(2021, 3, 2)
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                api.requests.append(("GET", self.path))
+                if not self._authorized():
+                    return
+                url = urlparse(self.path)
+                self._send(api.get(url.path, parse_qs(url.query)))
+
+            def do_PUT(self):
+                api.requests.append(("PUT", self.path))
+                if not self._authorized():
+                    return
+                length = int(self.headers['Content-Length'])
+                self._send(api.put(json.loads(self.rfile.read(length))))
+
+            def _authorized(self):
+                cookies = SimpleCookie(self.headers.get("Cookie", ""))
+                token = cookies.get("oauth_id_token")
+                if api.tokens is None or (token is not None and
+                                          token.value in api.tokens):
+                    return True
+                body = b'{"error": "unauthorized"}'
+                self.send_response(401)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return False
+
+            def _send(self, body):
+                body = json.dumps(body).encode()
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified",
+                                 format_datetime(api.clock, usegmt=False))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+
+    def get(self, path, query):
+        if path == "/tags":
+            names = sorted(set(t for a in self.annotations
+                               for t in a['tags']))
+            return [{"name": t, "id": t, "lastUsed": "2021-01-01T00:00:00",
+                     "annotationCount": sum(t in a['tags']
+                                            for a in self.annotations)}
+                    for t in names]
+        if path == "/folders":
+            return self.folders
+
+        found = sorted(self.annotations, reverse=True,
+                       key=lambda a: a['lastUpdated'])
+        if "tags" in query:
+            found = [a for a in found if query["tags"][0] in a['tags']]
+        if "searchPhrase" in query:
+            phrase = query["searchPhrase"][0].lower()
+            found = [a for a in found if phrase in
+                     (a['note']['title'] + a['note']['content']).lower()]
+        if "folderId" in query:
+            found = [a for a in found if query["folderId"][0]
+                     in [f['id'] for f in a['folders']]]
+        start = int(query.get("start", ["1"])[0]) - 1
+        num = int(query.get("numberToReturn", ["50"])[0])
+        if self.max_page is not None:
+            num = min(num, self.max_page)
+        return found[start:start + num]
+
+    def put(self, partials):
+        out = []
+        for p in partials:
+            a = [a for a in self.annotations if a['id'] == p['id']][0]
+            self.edit(a, {k: v for k, v in p.items()
+                          if k not in ("id", "lastUpdated")})
+            out.append(a)
+        return out
+
+    def edit(self, annotation, fields):
+        """Changes annotation as if it was edited on lds.org."""
+        if "note" in fields:
+            annotation['note'].update(fields.pop("note"))
+        annotation.update(fields)
+        self.clock += timedelta(minutes=1)
+        annotation['lastUpdated'] = self.clock.isoformat()
+
+    def endpoints(self):
+        """Returns module level names in ldsnotes.note to point at this
+        server, and the url for each."""
+        return {"TAGS": self.url + "/tags",
+                "FOLDERS": self.url + "/folders",
+                "ANNOTATIONS": self.url + "/annotations"}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Response:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class ContentAPI:
+    """Stands in for a requests.Session posting to the content endpoint."""
+
+    def __init__(self):
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def post(self, url, data):
+        with self._lock:
+            self.posts.append(list(data["uris"]))
+        time.sleep(0.05)
+        return Response({u: content(u) for u in data["uris"]})
@@ -0,0 +1,34 @@
+"""""""""Tests for the aggregation engine."""""""""
+
+import pytest
+from datetime import datetime
+from ldsnotes import Aggregator
+from tests.stub import journal
+
+
+def aggregator():
+    agg = Aggregator()
+    agg.add([journal(0, tags=["Faith"], when=datetime(2021, 3, 1)),
+             journal(1, tags=["Faith", "Hope"], folders=["f1"],
+                     when=datetime(2021, 2, 10)),
+             journal(2, when=datetime(2021, 2, 1))])
+    return agg
+
+
+def test_count():
+    agg = aggregator()
+    assert len(agg) == 3
+    assert agg.count("type") == {"journal": 3}
+    assert agg.count("color") == {None: 3}
+    assert agg.count("month") == {"2021-03": 1, "2021-02": 2}
+    assert agg.count("tags") == {"Faith": 2, "Hope": 1}
+    assert agg.count(["folders_id", "month"]) == {("f1", "2021-02"): 1}
+
+
+def test_where():
+    agg = aggregator()
+    assert agg.count("tags", where={"type": "journal"}) == \
+        {"Faith": 2, "Hope": 1}
+    assert agg.count("tags", where={"type": "highlight"}) == {}
+    with pytest.raises(ValueError):
+        agg.count("tags", where={"tags": "Faith"})
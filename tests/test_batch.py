@@ -0,0 +1,65 @@
+"""Tests for running many accounts against a local notes API stub."""
+
+import pytest
+from ldsnotes import BatchRunner, ResponseCache
+from tests.stub import content, highlight
+
+HEL = "/scriptures/bofm/hel/3.p29"
+
+
+@pytest.fixture
+def api(notes_api):
+    return notes_api([highlight(i, HEL) for i in range(8)],
+                     tokens={"alice", "bob"})
+
+
+@pytest.fixture
+def cache():
+    # already pulled, so highlights are parsed without the network
+    cache = ResponseCache()
+    cache.set("/eng" + HEL, content("/eng" + HEL))
+    return cache
+
+
+def job(notes):
+    parsed = [a for page in notes.pages(page_size=3)
+              for a in notes._make(page)]
+    return len(parsed), notes
+
+
+def test_summaries(api, cache):
+    runner = BatchRunner(["alice", {"token": "bob", "name": "Bob"},
+                          "mallory"], job, max_workers=3,
+                         content_cache=cache)
+    alice, bob, mallory = runner.run()
+
+    assert [s.name for s in (alice, bob, mallory)] == \
+        ["account 0", "Bob", "account 2"]
+    # one bad account doesn't stop the others
+    assert alice.result[0] == bob.result[0] == 8
+    assert alice.error is bob.error is None
+    assert mallory.result is None
+    assert "401" in mallory.error
+
+    for s in (alice, bob):
+        assert s.job_time > 0
+        assert s.total_time >= s.login_time + s.job_time
+        assert set(s.cache_stats) == {"http", "content"}
+
+
+def test_shared_resources(api, cache):
+    runner = BatchRunner(["alice", "bob"], job, content_cache=cache)
+    alice, bob = [s.result[1] for s in runner.run()]
+
+    assert alice.content_cache is bob.content_cache is cache
+    assert alice.content_session is bob.content_session is \
+        runner.content_session
+    assert alice.session is not bob.session
+    assert alice.session.get_adapter("https://lds.org") is \
+        bob.session.get_adapter("https://lds.org") is runner.adapter
+    assert runner.content_session.get_adapter("https://lds.org") is \
+        runner.adapter
+    # each page of each account was parsed from the one shared entry
+    assert cache.stats['hits'] == 2 * 3
+    assert cache.stats['misses'] == 0
+    assert len(cache) == 1
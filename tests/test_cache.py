@@ -0,0 +1,40 @@
+"""Tests for revalidating tag/folder responses against a local stub."""
+
+import pytest
+from ldsnotes import Notes
+from tests.stub import journal
+
+
+@pytest.fixture
+def api(notes_api):
+    return notes_api([journal(i, tags=["Faith"]) for i in range(30)])
+
+
+@pytest.fixture
+def notes(api):
+    return Notes(token="stub")
+
+
+def test_revalidated(api, notes):
+    first = notes.tags
+    assert notes.cache_stats['http'] == \
+        {"hits": 0, "misses": 1, "revalidated": 0, "stored": 1}
+
+    again = notes.tags
+    assert [t.name for t in again] == [t.name for t in first] == ["Faith"]
+    assert again[0].annotationCount == 30
+    assert notes.cache_stats['http'] == \
+        {"hits": 1, "misses": 1, "revalidated": 1, "stored": 1}
+
+    # changes come through
+    api.edit(api.annotations[0], {"tags": ["Hope"]})
+    assert [t.name for t in notes.tags] == ["Faith", "Hope"]
+    assert notes.cache_stats['http']['misses'] == 2
+
+
+def test_pages_not_cached(notes):
+    for _ in notes.pages(page_size=7):
+        pass
+    notes.search(start=1, stop=2, json=True)
+    assert notes.cache_stats['http']['misses'] == 1
+    assert len(notes.session.cache) == 1
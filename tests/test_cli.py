@@ -0,0 +1,111 @@
+"""""""""Tests for the command line interface against a local stub."""""""""
+
+import json
+import pytest
+import requests
+import ldsnotes.cli
+import ldsnotes.content
+import ldsnotes.note
+from ldsnotes.cli import main
+from ldsnotes import ResponseCache
+from tests.stub import content, highlight, journal, reference
+
+
+@pytest.fixture
+def api(notes_api):
+    return notes_api([journal(i, tags=["Faith"] if i % 2 else ["Hope"])
+                      for i in range(25)])
+
+
+def run(*args):
+    main(list(args) + ["--token", "stub", "--quiet", "--page-size", "10"])
+
+
+def test_export_jsonl(api, tmp_path):
+    out = tmp_path / "notes.jsonl"
+    run("export", "--output", str(out), "--concurrency", "3")
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [j['id'] for j in lines] == [f"note-{i}" for i in range(25)]
+
+
+def test_export_markdown(api, tmp_path):
+    run("export", "--format", "markdown", "--output", str(tmp_path))
+    assert (tmp_path / "note-3.md").read_text().startswith("# Note 3")
+
+    # unchanged notes aren't rewritten, deleted ones are removed
+    (tmp_path / "note-3.md").write_text("untouched")
+    api.annotations = api.annotations[1:]
+    run("export", "--format", "markdown", "--output", str(tmp_path))
+    assert (tmp_path / "note-3.md").read_text() == "untouched"
+    assert not (tmp_path / "note-0.md").exists()
+
+
+def test_export_markdown_highlights(notes_api, monkeypatch, tmp_path):
+    hel, john = "/scriptures/bofm/hel/3.p29", "/scriptures/nt/john/1.p1"
+    notes_api([highlight(0, hel), reference(1, hel, john)])
+    # content already pulled, so nothing goes to lds.org
+    cache = ResponseCache()
+    for u in (hel, john):
+        cache.set("/eng" + u, content("/eng" + u))
+    monkeypatch.setattr(ldsnotes.content, "CACHE", cache)
+
+    run("export", "--format", "markdown", "--output", str(tmp_path))
+    run("export", "--format", "markdown", "--output", str(tmp_path))
+    assert "Some verse." in (tmp_path / "note-0.md").read_text()
+    assert (tmp_path / "note-1.md").exists()
+
+
+def test_failed_export_closes_file(api, tmp_path, monkeypatch):
+    columns = ldsnotes.cli.columnar.columns
+    calls = []
+
+    def fail_second(page, **kwargs):
+        calls.append(page)
+        if len(calls) == 2:
+            raise requests.ConnectionError()
+        return columns(page, **kwargs)
+    monkeypatch.setattr(ldsnotes.cli.columnar, "columns", fail_second)
+
+    # pages written before the failure are flushed to disk (holding on to
+    # the traceback keeps the file object from being garbage collected)
+    out = tmp_path / "notes.csv"
+    with pytest.raises(requests.ConnectionError) as failed:
+        run("export", "--format", "csv", "--output", str(out),
+            "--workers", "1")
+    assert len(out.read_text().splitlines()) == 11
+    assert failed.traceback
+
+
+def test_filtered_markdown_keeps_others(api, tmp_path):
+    run("export", "--format", "markdown", "--output", str(tmp_path))
+    run("export", "--format", "markdown", "--output", str(tmp_path),
+        "--tag", "Faith")
+    assert (tmp_path / "note-0.md").exists()
+
+    # a note leaving the narrower query is kept if the broader one has it
+    api.edit(api.annotations[1], {"tags": ["Hope"]})
+    run("export", "--format", "markdown", "--output", str(tmp_path),
+        "--tag", "Faith")
+    assert (tmp_path / "note-1.md").exists()
+
+
+def test_search(api, capsys):
+    run("search", "--tag", "Faith", "--stop", "4")
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 3
+    assert all("(Journal) Note" in line for line in out)
+
+
+def test_sync(api, tmp_path, capsys):
+    out = tmp_path / "notes.jsonl"
+    run("export", "--output", str(out))
+    run("sync", str(out))
+
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    for j in lines[:3]:
+        j['tags'] = ["Charity"]
+    out.write_text("\n".join(json.dumps(j) for j in lines))
+    run("sync", str(out), "--profile", "--batch-size", "2")
+
+    assert "Pushed 3 annotations in 2 requests" in capsys.readouterr().out
+    assert api.annotations[0]['tags'] == ["Charity"]
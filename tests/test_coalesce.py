@@ -0,0 +1,38 @@
+"""""""""Tests for coalescing concurrent content requests."""""""""
+
+from concurrent.futures import ThreadPoolExecutor
+from ldsnotes import ContentCoalescer, ResponseCache
+from tests.stub import ContentAPI
+
+
+def test_coalesce():
+    api = ContentAPI()
+    coalescer = ContentCoalescer(window=0.05)
+    cache = ResponseCache()
+    wanted = [[f"/eng/v{i}", f"/eng/v{i + 1}", "/eng/common"]
+              for i in range(8)]
+
+    def fetch(uris):
+        return coalescer.fetch(uris, json=True, cache=cache, session=api)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        got = list(pool.map(fetch, wanted))
+
+    for uris, result in zip(wanted, got):
+        assert [r["uri"] for r in result] == uris
+    sent = [u for p in api.posts for u in p]
+    assert len(sent) == len(set(sent)) == 10
+    assert len(api.posts) < 8
+
+    # now cached, so nothing is sent
+    fetch(wanted[0])
+    assert len(sent) == sum(len(p) for p in api.posts)
+
+
+def test_max_batch():
+    api = ContentAPI()
+    coalescer = ContentCoalescer(window=0.2, max_batch=3)
+    uris = [f"/eng/v{i}" for i in range(7)]
+    result = coalescer.fetch(uris, json=True, cache=ResponseCache(),
+                             session=api)
+    assert [r["uri"] for r in result] == uris
+    assert [len(p) for p in api.posts] == [3, 3, 1]
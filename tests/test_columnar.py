@@ -0,0 +1,54 @@
+"""Tests for columnar export against a local notes API stub."""
+
+import pytest
+from ldsnotes import Notes, ResponseCache
+from ldsnotes import columnar
+from tests.stub import ContentAPI, journal, highlight
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("pandas")
+
+HEL = "/scriptures/bofm/hel/3.p29"
+
+
+@pytest.fixture
+def api(notes_api):
+    return notes_api([highlight(i, [HEL, HEL[:-2] + "30"], tags=["Faith"],
+                                color="blue" if i % 2 else "yellow")
+                      if i % 3 else journal(i) for i in range(12)])
+
+
+@pytest.fixture
+def notes(api):
+    return Notes(token="stub", content_cache=ResponseCache(),
+                 content_session=ContentAPI())
+
+
+def test_columns_one_fetch_per_page(api, notes):
+    page = next(notes.pages(page_size=12))
+    cols = columnar.columns(page, cache=ResponseCache(),
+                            session=notes.content_session)
+    assert cols['id'] == [j['id'] for j in page]
+    assert cols['uri'][1] == HEL
+    assert cols['publication'][1] == "Book of Mormon"
+    assert cols['color'][0] is None
+    assert len(notes.content_session.posts) == 1
+
+
+def test_dataframe(api, notes):
+    df = notes.to_dataframe(page_size=5)
+    assert list(df['id']) == [f"note-{i}" for i in range(12)]
+    assert str(df['color'].dtype) == "category"
+    assert str(df['last_update'].dtype).startswith("datetime64")
+    assert set(df['color'].dropna()) == {"blue", "yellow"}
+
+    # same columns from parsed objects
+    parsed = notes.search(start=1, stop=13)
+    objects = columnar.annotation_columns(parsed)
+    assert objects['id'] == list(df['id'])
+    # pandas has nan for missing strings
+    assert objects['uri'] == \
+        [u if isinstance(u, str) else None for u in df['uri']] == \
+        [HEL if i % 3 else None for i in range(12)]
+    assert objects['color'] == list(df['color'].astype(object).where(
+        df['color'].notna(), None))
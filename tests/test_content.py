@@ -0,0 +1,32 @@
+"""""""""Tests for batched multi-locale content fetching."""""""""
+
+from ldsnotes import Content, ResponseCache
+from tests.stub import ContentAPI
+
+
+def test_one_request_per_locale():
+    api = ContentAPI()
+    uris = ["/eng/scriptures/bofm/hel/3.p29", "/spa/scriptures/bofm/hel/3.p29",
+            "/eng/scriptures/nt/heb/4.p12", "/eng/scriptures/bofm/hel/3.p29"]
+    got = Content.fetch(uris, json=True, cache=ResponseCache(), session=api)
+    assert [g["uri"] for g in got] == uris
+    assert sorted(api.posts) == [uris[:3:2], [uris[1]]]
+
+
+def test_fetch_locales():
+    api = ContentAPI()
+    cache = ResponseCache()
+    Content.fetch(["/eng/scriptures/bofm/hel/3.p29"], json=True, cache=cache,
+                  session=api)
+
+    got = Content.fetch_locales(
+        ["/scriptures/bofm/hel/3.p29", "/eng/scriptures/bofm/hel/3.p29",
+         "/scriptures/nt/heb/4.p12"], ["eng", "spa"],
+        json=True, cache=cache, session=api)
+    assert got["spa"]["/scriptures/nt/heb/4.p12"]["uri"] == \
+        "/spa/scriptures/nt/heb/4.p12"
+    assert set(got["eng"]) == set(got["spa"]) == \
+        {"/scriptures/bofm/hel/3.p29", "/scriptures/nt/heb/4.p12"}
+    # hel 3:29 in english was already cached, nothing is asked for twice
+    sent = [u for p in api.posts for u in p]
+    assert len(sent) == len(set(sent)) == 4
@@ -0,0 +1,57 @@
+"""""""""Tests for fingerprints and snapshot diffs."""""""""
+
+from ldsnotes import Journal, Highlight, Reference, diff, fingerprints
+from tests.stub import content, highlight, journal, reference
+
+HEL = "/scriptures/bofm/hel/3.p29"
+JOHN = "/scriptures/nt/john/1.p1"
+
+
+def test_fingerprint_ignores_last_update():
+    a = journal(1, tags=["Faith"])
+    b = dict(a, lastUpdated="2030-01-01T00:00:00")
+    assert Journal(a).fingerprint == Journal(b).fingerprint
+
+    c = journal(1, tags=["Faith", "Hope"])
+    assert Journal(a).fingerprint != Journal(c).fingerprint
+
+
+def test_diff():
+    old = [Journal(journal(i)) for i in range(5)]
+    new = [Journal(journal(i)) for i in range(1, 6)]
+    new[0].note = "Edited"
+
+    d = diff(fingerprints(old), new)
+    assert d.created == ["note-5"]
+    assert d.updated == ["note-1"]
+    assert d.deleted == ["note-0"]
+    assert d.unchanged == ["note-2", "note-3", "note-4"]
+
+
+def test_highlights_and_references():
+    hl = highlight(1, [HEL, HEL[:-2] + "30"])
+    ref = reference(2, HEL, [JOHN, JOHN[:-1] + "2"])
+    old = [Highlight(hl, [content(HEL), content(HEL[:-2] + "30")]),
+           Reference(ref, [content(HEL)], [content(JOHN),
+                                           content(JOHN[:-1] + "2")])]
+    new = [Highlight(dict(hl, lastUpdated="2030-01-01T00:00:00"),
+                     [content(HEL), content(HEL[:-2] + "30")]),
+           Reference(dict(ref, refs=ref['refs'][:1]), [content(HEL)],
+                     [content(JOHN)])]
+
+    d = diff(old, new)
+    assert d.unchanged == ["note-1"]
+    assert d.updated == ["note-2"]
+
+
+def test_fingerprint_missing_fields():
+    a = Journal(journal(1))
+    a.note = None
+    b = Journal(journal(1))
+    b.note = ""
+    assert a.fingerprint != b.fingerprint
+
+
+def test_module_not_shadowed():
+    import ldsnotes.changes as changes
+    assert changes.diff is diff
@@ -0,0 +1,47 @@
+"""""""""Tests for the cross reference graph."""""""""
+
+from ldsnotes import ReferenceGraph, Reference
+from tests.stub import content, reference
+
+HEL = "/scriptures/bofm/hel/3.p29"
+HEB = "/scriptures/nt/heb/4.p12"
+ALMA = "/scriptures/bofm/alma/32.p21"
+JOHN = "/scriptures/nt/john/1.p1"
+
+
+def graph():
+    g = ReferenceGraph()
+    g.add([reference(0, HEL, HEB), reference(1, ALMA, HEL)])
+    g.add([reference(2, HEB, [JOHN, ALMA]), reference(0, HEL, HEB)])
+    return g
+
+
+def test_links():
+    g = graph()
+    assert g.edges == 4
+    assert g.links_from(HEL) == [HEB]
+    assert g.links_to(HEL) == [ALMA]
+    assert g.links_to("/scriptures/bofm/hel/3") == [ALMA]
+    assert g.most_linked(1, by_chapter=False) == [(HEB, 3)]
+
+
+def test_neighbourhood():
+    g = graph()
+    assert g.neighbourhood(HEL, k=1) == {HEB: 1, ALMA: 1}
+    assert g.neighbourhood(HEL, k=2, direction="out") == \
+        {HEB: 1, JOHN: 2, ALMA: 2}
+
+
+def test_multi_verse_objects():
+    src = [HEL, "/scriptures/bofm/hel/3.p30"]
+    dst = [JOHN, "/scriptures/nt/john/1.p2", "/scriptures/nt/john/1.p3"]
+    j = reference(0, src, dst)
+    obj = Reference(j, [content(u) for u in src], [content(u) for u in dst])
+    assert obj.url.endswith("3.p29-p30?lang=eng")
+
+    raw, objects = ReferenceGraph(), ReferenceGraph()
+    raw.add([j])
+    objects.add([obj])
+    assert objects.edges == raw.edges == 6
+    assert sorted(objects.uris) == sorted(raw.uris) == sorted(src + dst)
+    assert objects.links_to("/scriptures/nt/john/1.p3") == src
@@ -4,7 +4,8 @@
 
 import pytest
 import os
-from ldsnotes import Notes, Bookmark, Journal, Highlight, Reference
+from ldsnotes import Notes, Bookmark, Journal, Highlight, Reference, \
+    BatchRunner
 
 
 @pytest.fixture(scope="session")
@@ -59,6 +60,15 @@ def test_folder(notes):
         assert j_id in i.folders_id
 
 
+def test_multi_search(notes):
+    n = notes.multi_search(tags=["Faith", "Hope"], stop=6)
+    for i in n:
+        assert "Faith" in i.tags or "Hope" in i.tags
+    assert len(set(i.id for i in n)) == len(n)
+    assert [i.last_update for i in n] == \
+        sorted([i.last_update for i in n], reverse=True)
+
+
 """""""""           TEST INDEXING          """""""""
 
 
@@ -66,3 +76,60 @@ def test_index(notes):
     assert not isinstance(notes[1], list)
     assert len(notes[:10]) == 10
     assert len(notes[1:11]) == 10
+
+
+"""""""""           TEST CACHING          """""""""
+
+
+def test_cache(notes):
+    notes.tags
+    before = notes.cache_stats['http']
+    notes.tags
+    after = notes.cache_stats['http']
+    assert after['misses'] + after['revalidated'] == \
+        before['misses'] + before['revalidated'] + 1
+
+    notes.search(annot_type="highlight", start=1, stop=3)
+    hits = notes.cache_stats['content']['hits']
+    notes.search(annot_type="highlight", start=1, stop=3)
+    assert notes.cache_stats['content']['hits'] > hits
+
+
+def test_compact(notes):
+    n = notes.search(annot_type="highlight", start=1, stop=3)
+    assert not hasattr(n[0], '__dict__')
+    again = notes.search(annot_type="highlight", start=1, stop=3)
+    assert again[0].content is n[0].content
+
+
+"""""""""           TEST COLUMNAR EXPORT          """""""""
+
+
+def test_dataframe(notes):
+    df = notes.to_dataframe(annot_type="highlight", page_size=5)
+    n = notes.search(annot_type="highlight", start=1, stop=3)
+    assert list(df['id'][:2]) == [i.id for i in n]
+    assert str(df['color'].dtype) == "category"
+
+
+"""""""""           TEST FOLDER INDEX          """""""""
+
+
+def test_folder_index(notes):
+    index = notes.folder_index()
+    n = notes.search(folder="Journal", annot_type="highlight", start=1, stop=3)
+    for i in n:
+        assert "Journal" in [f.name for f in index.folders_of(i.id)]
+        assert i.id in index.notes_in("Journal")
+
+
+"""""""""           TEST BATCH RUNNER          """""""""
+
+
+def test_batch(notes):
+    runner = BatchRunner([notes.token, {"token": notes.token, "name": "me"}],
+                         lambda n: len(n[:5]), max_workers=2)
+    summary = runner.run()
+    assert [s.result for s in summary] == [5, 5]
+    assert summary[1].name == "me"
+    assert all(s.error is None for s in summary)
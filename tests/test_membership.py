@@ -0,0 +1,52 @@
+"""Tests for the folder index against a local notes API stub."""
+
+import pytest
+from ldsnotes import Notes
+from tests.stub import folder, journal
+
+
+@pytest.fixture
+def api(notes_api):
+    annotations = [journal(i, folders=["f-study"] if i % 2 else
+                           ["f-study", "f-journal"]) for i in range(6)]
+    return notes_api(annotations, [folder("f-study", "Study", annotations),
+                                   folder("f-journal", "Journal",
+                                          annotations)])
+
+
+@pytest.fixture
+def notes(api):
+    return Notes(token="stub")
+
+
+def test_lookups(notes):
+    index = notes.folder_index()
+    assert len(index) == 6
+    assert [f.name for f in index.folders_of("note-0")] == \
+        ["Study", "Journal"]
+    assert [f.name for f in index.folders_of("note-1")] == ["Study"]
+
+    journal_folder = notes.folders[1]
+    assert index.notes_in("Journal") == index.notes_in("f-journal") == \
+        index.notes_in(journal_folder) == ["note-0", "note-2", "note-4"]
+
+
+def test_update_from_pages(api, notes):
+    index = notes.folder_index()
+    api.edit(api.annotations[1], {"folders": [{"id": "f-journal"}]})
+    api.edit(api.annotations[2], {"folders": []})
+    for page in notes.pages(page_size=4):
+        index.update(page)
+
+    assert [f.name for f in index.folders_of("note-1")] == ["Journal"]
+    assert "note-2" not in index
+    assert index.notes_in("Journal") == ["note-0", "note-4", "note-1"]
+
+    # parsed objects work too
+    api.edit(api.annotations[3], {"folders": [{"id": "f-journal"}]})
+    index.update(notes.search(start=1, stop=2))
+    assert [f.name for f in index.folders_of("note-3")] == ["Journal"]
+
+    index.remove("note-0")
+    assert "note-0" not in index
+    assert len(index) == 4
@@ -0,0 +1,80 @@
+"""""""""Tests for adaptive page sizing."""""""""
+
+import pytest
+import requests
+from ldsnotes import Notes, PageSizer
+from tests.stub import journal
+
+
+def test_grows_while_faster():
+    sizer = PageSizer(initial=20, max_size=100)
+    sizer.record(20, 20, 1.0)
+    assert sizer.size == 30
+    sizer.record(30, 30, 0.5)
+    assert sizer.size == 45
+    # slower, so turn around
+    sizer.record(45, 45, 10.0)
+    assert sizer.size == 30
+
+
+def test_shrinks_big_payloads():
+    sizer = PageSizer(initial=100, max_bytes=1000)
+    sizer.record(100, 100, 0.1, nbytes=5000)
+    assert sizer.size < 100
+
+
+def test_failures():
+    sizer = PageSizer(initial=40, min_size=10, retries=2)
+    assert sizer.failed() and sizer.size == 20
+    assert sizer.failed() and sizer.size == 10
+    assert sizer.failed()
+    assert not sizer.failed()
+
+
+def test_auto_pages(notes_api, monkeypatch):
+    notes_api([journal(i) for i in range(300)])
+
+    # first request times out
+    get = requests.Session.get
+    calls = []
+
+    def flaky(self, *args, **kwargs):
+        calls.append(kwargs['params']['numberToReturn'])
+        if len(calls) == 1:
+            raise requests.Timeout()
+        return get(self, *args, **kwargs)
+    monkeypatch.setattr(requests.Session, "get", flaky)
+
+    sizer = PageSizer(initial=40)
+    pages = list(Notes(token="stub").pages(page_size=sizer))
+    assert [j['id'] for p in pages for j in p] == \
+        [f"note-{i}" for i in range(300)]
+    assert calls[:2] == [40, 20]
+    assert len(sizer.history) == len(pages)
+
+
+def test_fixed_size_raises(monkeypatch):
+    def broken(self, *args, **kwargs):
+        raise requests.ConnectionError()
+    monkeypatch.setattr(requests.Session, "get", broken)
+    with pytest.raises(requests.ConnectionError):
+        next(Notes(token="stub").pages(page_size=10))
+
+
+@pytest.mark.parametrize("page_size", [200, "auto"])
+def test_capped_pages(notes_api, page_size):
+    api = notes_api([journal(i) for i in range(300)])
+    api.max_page = 30
+    sizer = PageSizer(initial=200) if page_size == "auto" else page_size
+    pages = list(Notes(token="stub").pages(page_size=sizer, concurrency=2))
+    assert [j['id'] for p in pages for j in p] == \
+        [f"note-{i}" for i in range(300)]
+    if page_size == "auto":
+        assert sizer.max_size == 30
+
+
+def test_auth_errors_not_retried(notes_api):
+    api = notes_api([journal(i) for i in range(10)], tokens={"good"})
+    with pytest.raises(requests.HTTPError):
+        next(Notes(token="bad").pages(page_size="auto"))
+    assert len(api.requests) == 1
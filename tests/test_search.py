@@ -0,0 +1,59 @@
+"""Tests for searching several tags/folders/keywords at once against a
+local notes API stub."""
+
+import pytest
+from ldsnotes import Notes, Journal
+from tests.stub import folder, journal
+
+
+def tags(i):
+    return (["Faith"] if i % 2 == 0 else []) + \
+        (["Hope"] if i % 3 == 0 else [])
+
+
+@pytest.fixture
+def api(notes_api):
+    annotations = [journal(i, tags(i), ["f-study"] if i < 12 else [])
+                   for i in range(30)]
+    return notes_api(annotations, [folder("f-study", "Study", annotations)])
+
+
+@pytest.fixture
+def notes(api):
+    return Notes(token="stub")
+
+
+def ids(found):
+    return [j['id'] for j in found]
+
+
+def test_any_tag(notes):
+    # most recently edited first, notes with both tags only once
+    expected = [f"note-{i}" for i in range(30) if len(tags(i)) != 0]
+    assert ids(notes.multi_search(tags=["Faith", "Hope"], stop=31,
+                                  json=True)) == expected
+    assert ids(notes.multi_search(tags=["Faith", "Hope"], start=3, stop=6,
+                                  json=True)) == expected[2:5]
+
+    parsed = notes.multi_search(tags=["Faith", "Hope"], stop=4)
+    assert all(isinstance(a, Journal) for a in parsed)
+    assert [a.id for a in parsed] == expected[:3]
+
+
+def test_all_tags_pages_rarest(api, notes):
+    found = notes.multi_search(tags=["Faith", "Hope"], all_tags=True,
+                               stop=31, json=True)
+    assert ids(found) == [f"note-{i}" for i in range(0, 30, 6)]
+
+    searched = [p for _, p in api.requests if p.startswith("/annotations")]
+    assert all("tags=Hope" in p for p in searched)
+
+
+def test_folders_and_keywords(notes):
+    found = notes.multi_search(keywords=["Note 1", "Note 2"],
+                               folders=["Study"], stop=31, json=True)
+    # "Note 1" also matches Note 10, 11, ...
+    assert ids(found) == ["note-1", "note-2", "note-10", "note-11"]
+
+    with pytest.raises(ValueError, match="Nope"):
+        notes.multi_search(folders=["Study", "Nope"])
@@ -0,0 +1,59 @@
+"""""""""Tests for binary snapshots."""""""""
+
+from sys import intern
+
+import pytest
+from ldsnotes import Journal, Highlight, Tag, Notes, StaleSnapshotError
+from ldsnotes import snapshot
+from tests.stub import content, highlight, journal
+
+HEL = "/scriptures/bofm/hel/3.p29"
+
+
+@pytest.fixture
+def saved(tmp_path):
+    path = tmp_path / "notes.snap"
+    notes = [Journal(journal(i, tags=["Faith"])) for i in range(30)]
+    tags = [Tag(name="Faith", id="Faith", annotationCount=30,
+                lastUsed="2021-01-01T00:00:00")]
+    snapshot.save(path, notes, tags, block_size=7)
+    return path, notes
+
+
+def test_roundtrip(saved):
+    path, notes = saved
+    snap = Notes.load_snapshot(path)
+    assert [a.id for a in snap.annotations] == [a.id for a in notes]
+    assert [a.fingerprint for a in snap.annotations] == \
+        [a.fingerprint for a in notes]
+    assert snap.tags[0].name == "Faith"
+
+
+def test_partial(saved):
+    path, notes = saved
+    assert snapshot.load(path, types="highlight").annotations == []
+    snap = snapshot.load(path, ids=("note-10", "note-12"), catalog=False)
+    assert sorted(a.id for a in snap.annotations) == \
+        ["note-10", "note-11", "note-12"]
+    assert snap.tags == []
+
+
+def test_stale(saved, monkeypatch):
+    path, _ = saved
+    monkeypatch.setattr("ldsnotes.__version__", "9.9.9")
+    with pytest.raises(StaleSnapshotError):
+        snapshot.load(path)
+
+
+def test_strings_shared_across_blocks(tmp_path):
+    path = tmp_path / "notes.snap"
+    notes = [Highlight(highlight(i, HEL, tags=["Faith"]), [content(HEL)])
+             for i in range(10)]
+    snapshot.save(path, notes, block_size=3)
+    first, *_, last = snapshot.load(path).annotations
+
+    assert first.tags[0] is last.tags[0] is intern("Faith")
+    assert first.color is intern("yellow")
+    assert first.publication is last.publication
+    assert first.content is last.content
+    assert first.url is last.url
@@ -0,0 +1,83 @@
+"""""""""Tests for two way sync against a local notes API stub."""""""""
+
+import pytest
+from ldsnotes import Notes, SyncEngine, FolderIndex
+from tests.stub import journal
+
+
+@pytest.fixture
+def api(notes_api):
+    return notes_api([journal(i, tags=["Faith"]) for i in range(120)])
+
+
+@pytest.fixture
+def notes(api):
+    return Notes(token="stub")
+
+
+def puts(api):
+    return [r for r in api.requests if r[0] == "PUT"]
+
+
+def test_no_changes(api, notes):
+    sync = SyncEngine(notes)
+    n = notes.search(start=1, stop=11)
+    sync.track(n)
+    assert sync.push(n).requests == 0
+    assert len(puts(api)) == 0
+
+
+def test_only_changed_fields(api, notes):
+    sync = SyncEngine(notes, batch_size=2)
+    n = notes.search(start=1, stop=11)
+    sync.track(n)
+    for i in n[:3]:
+        i.tags.append("Hope")
+    n[3].title = "New title"
+
+    changes = sync.changes(n)
+    assert [c.fields for c in changes] == \
+        [{"tags": ["Faith", "Hope"]}] * 3 + [{"title": "New title"}]
+
+    result = sync.push(n)
+    assert result.conflicts == []
+    assert result.pushed == [i.id for i in n[:4]]
+    assert result.requests == len(puts(api)) == 2
+
+    server = {a['id']: a for a in api.annotations}
+    assert server[n[0].id]['tags'] == ["Faith", "Hope"]
+    assert server[n[3].id]['note'] == {"title": "New title",
+                                       "content": "Some thoughts."}
+    # nothing left to push
+    assert sync.changes(n) == []
+
+
+def test_conflict(api, notes):
+    sync = SyncEngine(notes)
+    n = notes.search(start=50, stop=53)
+    sync.track(n)
+    n[0].tags = ["Hope"]
+    n[1].tags = ["Charity"]
+
+    # someone edits the first one on lds.org in the meantime
+    api.edit([a for a in api.annotations if a['id'] == n[0].id][0],
+             {"tags": ["Faith", "Charity"]})
+
+    result = sync.push(n)
+    assert [c.id for c in result.conflicts] == [n[0].id]
+    assert result.conflicts[0].server['tags'] == ["Faith", "Charity"]
+    assert result.pushed == [n[1].id]
+
+
+def test_state_roundtrip(api, notes, tmp_path):
+    sync = SyncEngine(notes)
+    n = notes.search(start=1, stop=3)
+    sync.track(n)
+    sync.save(tmp_path / "state.json")
+
+    n[0].note = "Edited"
+    index = FolderIndex()
+    n[1].folders_id = ["folder-1"]
+    again = SyncEngine.load(notes, tmp_path / "state.json", index=index)
+    assert again.push(n).pushed == [n[0].id, n[1].id]
+    assert index.notes_in("folder-1") == [n[1].id]
@@ -0,0 +1,146 @@
+"""Tests for watching for changes against a local notes API stub."""
+
+import pytest
+import requests
+from ldsnotes import Notes, Watcher, Journal
+from tests.stub import journal
+
+
+@pytest.fixture
+def api(notes_api):
+    return notes_api([journal(i, tags=["Faith"]) for i in range(30)])
+
+
+@pytest.fixture
+def notes(api):
+    return Notes(token="stub")
+
+
+def gets(api):
+    return [r for r in api.requests if r[0] == "GET"]
+
+
+def test_idle_poll_is_cheap(api, notes):
+    w = Watcher(notes)
+    assert w.poll() == []
+    assert len(w.known) == 30
+
+    before = len(gets(api))
+    assert w.poll() == []
+    # newest annotation, tags and folders only
+    assert len(gets(api)) - before == 3
+
+
+def test_created_and_updated(api, notes):
+    w = Watcher(notes)
+    w.poll()
+
+    api.edit(api.annotations[5], {"tags": ["Faith", "Hope"]})
+    new = journal(99)
+    api.annotations.append(new)
+    api.edit(new, {})
+
+    events = w.poll()
+    assert [(e.kind, e.id) for e in events] == \
+        [("updated", "note-5"), ("created", "note-99")]
+    assert isinstance(events[0].annotation, Journal)
+    assert events[0].annotation.tags == ["Faith", "Hope"]
+    assert w.poll() == []
+
+
+def test_deleted(api, notes):
+    w = Watcher(notes, parse=False)
+    w.poll()
+
+    # drops the Faith count, so everything is rescanned
+    del api.annotations[10]
+    api.edit(api.annotations[3], {"tags": []})
+    before = len(gets(api))
+    events = w.poll()
+    assert [(e.kind, e.id) for e in events] == \
+        [("deleted", "note-10"), ("updated", "note-3")]
+    assert events[1].annotation['tags'] == []
+    assert "note-10" not in w.known
+    # the poll plus one pass over every annotation (and the empty page
+    # that ends it)
+    assert len(gets(api)) - before == 5
+
+
+def test_rescan_every(api, notes):
+    w = Watcher(notes, rescan_every=2)
+    w.poll()
+
+    # untagged notes don't change any counts
+    api.annotations.append(journal(99, when=api.clock.replace(year=2000)))
+    events = w.poll()
+    assert [(e.kind, e.id) for e in events] == [("created", "note-99")]
+
+
+def test_backoff(api, notes):
+    waits = []
+    w = Watcher(notes, interval=10, backoff=2, max_interval=50, jitter=0,
+                sleep=waits.append)
+    stream = iter(w)
+
+    def edit_after(n):
+        def sleep(s):
+            waits.append(s)
+            if len(waits) == n:
+                api.edit(api.annotations[0], {"tags": []})
+        return sleep
+
+    # no backoff after the first poll pulls every id
+    w.sleep = edit_after(4)
+    event = next(stream)
+    assert event.kind == "updated"
+    assert waits == [10, 20, 40, 50]
+
+    # a change resets the wait
+    def stop(s):
+        waits.append(s)
+        raise KeyboardInterrupt
+    w.sleep = stop
+    with pytest.raises(KeyboardInterrupt):
+        next(stream)
+    assert waits[-1] == 10
+
+
+def test_failed_polls_back_off(api, notes, monkeypatch):
+    waits = []
+    w = Watcher(notes, interval=10, backoff=3, jitter=0, sleep=waits.append)
+    w.poll()
+
+    def fail():
+        raise requests.ConnectionError()
+    monkeypatch.setattr(w, "poll", fail)
+
+    stream = iter(w)
+
+    def stop(s):
+        waits.append(s)
+        if len(waits) == 2:
+            raise KeyboardInterrupt
+    w.sleep = stop
+    with pytest.raises(KeyboardInterrupt):
+        next(stream)
+    assert waits == [30, 90]
+
+
+def test_failed_parse_is_retried(api, notes, monkeypatch):
+    w = Watcher(notes)
+    w.poll()
+    del api.annotations[10]
+    api.edit(api.annotations[3], {"tags": []})
+
+    make = notes._make
+
+    def fail_once(json):
+        monkeypatch.setattr(notes, "_make", make)
+        raise requests.ConnectionError()
+    monkeypatch.setattr(notes, "_make", fail_once)
+    with pytest.raises(requests.ConnectionError):
+        w.poll()
+
+    events = w.poll()
+    assert [(e.kind, e.id) for e in events] == \
+        [("deleted", "note-10"), ("updated", "note-3")]